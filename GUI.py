@@ -1,14 +1,61 @@
+import time
+
+# Taken before anything else is imported so startup timings cover the whole launch
+_START_TIME = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, messagebox
-import joblib
-import pandas as pd
-import re
-from PIL import Image, ImageTk
+from tkinter import ttk, messagebox, filedialog
 import os
 import math
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import JsonLogSink, set_sink, stage, timed
+
+# joblib, pandas, PIL and the scoring modules are imported on first use so the
+# window can appear before they load
+
+MODEL_PATH = 'models/random_forest_model.pkl'
+LOGO_PATH = 'instagram_logo.png'
+IDLE_MESSAGE = "Enter account details and click 'Analyze Account'"
+# How often the UI thread checks on background work
+POLL_MS = 20
+# Live mode: quiet time after the last edit before rescoring, and the redraw frame budget
+LIVE_DEBOUNCE_MS = 150
+FRAME_MS = 33
+# Raw input fields, in extract_features argument order
+INPUT_FIELDS = ['username', 'fullname', 'bio', 'has_pic', 'is_private', 'posts', 'followers', 'following']
+# Radar chart axes and the model features whose contributions each one sums
+RADAR_GROUPS = [
+    ('Username', ['nums/length username', 'name==username']),
+    ('Full Name', ['fullname words', 'nums/length fullname']),
+    ('Bio', ['description length', 'external URL']),
+    ('Posts', ['#posts']),
+    ('Followers', ['#followers']),
+    ('Following', ['#follows']),
+    ('Picture/Privacy', ['profile pic', 'private']),
+]
+RADAR_LABELS = [label for label, _ in RADAR_GROUPS]
+# Short names for the reason bars
+FEATURE_LABELS = {
+    'profile pic': 'Profile pic',
+    'nums/length username': 'Username digits',
+    'fullname words': 'Name words',
+    'nums/length fullname': 'Name digits',
+    'name==username': 'Name = username',
+    'description length': 'Bio length',
+    'external URL': 'External URL',
+    'private': 'Private',
+    '#posts': 'Posts',
+    '#followers': 'Followers',
+    '#follows': 'Following',
+}
+# Contribution drawn at full bar height / at the radar rim
+MAX_CONTRIBUTION = 0.5
 
 class SmartInstagramAuthenticityApp:
-    def __init__(self, root):
+    def __init__(self, root, model_version=None):
         self.root = root
         self.root.title("Smart Instagram Checker")
         self.root.geometry("1000x700")  # Adjusted for better fit
@@ -59,16 +106,97 @@ class SmartInstagramAuthenticityApp:
         self.style.theme_use('clam')
         self.configure_styles()
         
-        # Load model
+        # Create GUI in scrollable frame
+        self.create_widgets()
+        
+        # Scoring runs on a single worker; only the newest request's result is shown
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self._request_id = 0
+        self._pending = None
+        self._last_result = None
+        # Chart canvases, built on the first result and reused afterwards
+        self.viz_container = None
+        # Live mode: features of the current form, and the fields edited since they were computed
+        self._live_features = None
+        self._dirty_fields = set()
+        self._live_after = None
+        self._live_result = None
+        self._redraw_after = None
+        self._last_redraw = 0.0
+        
+        # Load model in the background; Analyze stays disabled until it is ready
+        self.model = None
+        self.record_scorer = None
+        self.live_scorer = None
+        self.model_version = model_version
+        self.score_cache = None
+        self.startup_timings = {}
+        self._model_queue = queue.Queue()
+        self.set_model_loading(True)
+        threading.Thread(target=self._load_model, daemon=True).start()
+        self.root.after(50, self._check_model_loaded)
+        self.root.after_idle(self._record_startup_time, 'window_ms')
+
+    def _record_startup_time(self, stage):
+        """Store milliseconds elapsed since the module started importing"""
+        self.startup_timings[stage] = (time.perf_counter() - _START_TIME) * 1000
+
+    def _load_model(self):
+        """Import the scoring stack and load the model (runs on a worker thread)"""
         try:
-            self.model = joblib.load('models/random_forest_model.pkl')
+            import features  # warm the import used by the first analysis
+            from model_registry import list_versions
+            from score_cache import ScoreCache, model_version
+            from scoring import RecordScorer, load_model, resolve_model_path
+            
+            # Prefer the newest registered model; fall back to the pickle before any are registered
+            version = self.model_version
+            if version is None and list_versions():
+                version = 'latest'
+            model_path = resolve_model_path(MODEL_PATH, version)
+            # Single accounts are scored through the compiled forest in one pass
+            record_scorer = RecordScorer(load_model(model_path))
+            # RecordScorer reuses one row buffer, so live mode on the UI thread gets its own
+            live_scorer = RecordScorer(record_scorer.model)
+            score_cache = ScoreCache(maxsize=1000, model_version=model_version(model_path))
+            self._model_queue.put((record_scorer, live_scorer, score_cache, None))
         except Exception as e:
-            messagebox.showerror("Error", f"Model not found: {str(e)}")
+            self._model_queue.put((None, None, None, e))
+
+    def _check_model_loaded(self):
+        """Poll for the background loader and hand its result to the UI thread"""
+        try:
+            record_scorer, live_scorer, score_cache, error = self._model_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._check_model_loaded)
+            return
+        
+        if error is not None:
+            messagebox.showerror("Error", f"Model not found: {str(error)}")
             self.root.destroy()
             return
         
-        # Create GUI in scrollable frame
-        self.create_widgets()
+        self.record_scorer = record_scorer
+        self.live_scorer = live_scorer
+        self.model = record_scorer.model
+        self.score_cache = score_cache
+        self.set_model_loading(False)
+        self._record_startup_time('model_ready_ms')
+        print("Startup: window {window_ms:.0f} ms, model ready {model_ready_ms:.0f} ms".format(
+            window_ms=self.startup_timings.get('window_ms', 0),
+            model_ready_ms=self.startup_timings['model_ready_ms']
+        ))
+
+    def set_model_loading(self, loading):
+        """Toggle the 'loading model' state of the Analyze button and status text"""
+        if loading:
+            self.analyze_button.configure(text="Loading model...", state=tk.DISABLED)
+            self.import_button.configure(state=tk.DISABLED)
+            self.result_text.set("Loading model, please wait...")
+        else:
+            self.analyze_button.configure(text="Analyze Account", state=tk.NORMAL)
+            self.import_button.configure(state=tk.NORMAL)
+            self.result_text.set(IDLE_MESSAGE)
 
     def _on_mousewheel(self, event):
         """Handle mousewheel scrolling"""
@@ -93,13 +221,15 @@ class SmartInstagramAuthenticityApp:
         header_frame = ttk.Frame(self.scrollable_frame, style='Highlight.TFrame')
         header_frame.pack(fill=tk.X, pady=(0, 20))
         
-        # App logo placeholder
-        try:
-            logo_img = Image.open("instagram_logo.png").resize((50, 50))
-            self.logo = ImageTk.PhotoImage(logo_img)
-            ttk.Label(header_frame, image=self.logo).pack(side=tk.LEFT, padx=15)
-        except:
-            pass
+        # App logo placeholder (PIL is only imported when there is a logo to show)
+        if os.path.exists(LOGO_PATH):
+            try:
+                from PIL import Image, ImageTk
+                logo_img = Image.open(LOGO_PATH).resize((50, 50))
+                self.logo = ImageTk.PhotoImage(logo_img)
+                ttk.Label(header_frame, image=self.logo).pack(side=tk.LEFT, padx=15)
+            except:
+                pass
         
         ttk.Label(
             header_frame,
@@ -232,12 +362,21 @@ class SmartInstagramAuthenticityApp:
         button_frame = ttk.Frame(self.scrollable_frame)
         button_frame.pack(pady=20)
         
-        ttk.Button(
+        self.analyze_button = ttk.Button(
             button_frame,
             text="Analyze Account",
             command=self.analyze_account,
             style='Accent.TButton'
-        ).pack(side=tk.LEFT, padx=10)
+        )
+        self.analyze_button.pack(side=tk.LEFT, padx=10)
+        
+        # Busy indicator, only packed while an analysis is running
+        self.busy_indicator = ttk.Progressbar(
+            button_frame,
+            orient='horizontal',
+            length=80,
+            mode='indeterminate'
+        )
         
         ttk.Button(
             button_frame,
@@ -251,6 +390,31 @@ class SmartInstagramAuthenticityApp:
             command=self.fill_example
         ).pack(side=tk.LEFT, padx=10)
         
+        self.import_button = ttk.Button(
+            button_frame,
+            text="Import CSV",
+            command=self.import_csv
+        )
+        self.import_button.pack(side=tk.LEFT, padx=10)
+        
+        self.live_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            button_frame,
+            text="Live",
+            variable=self.live_var,
+            command=self.schedule_live_update,
+            style='TLabel'
+        ).pack(side=tk.LEFT, padx=10)
+        
+        # Report edits per field so live mode only recomputes what changed
+        for field, widget in [('username', self.username_entry), ('fullname', self.fullname_entry),
+                              ('bio', self.bio_text), ('posts', self.posts_entry),
+                              ('followers', self.followers_entry), ('following', self.following_entry)]:
+            widget.bind('<KeyRelease>', lambda event, field=field: self.on_field_changed(field), add='+')
+        self.account_type.bind('<<ComboboxSelected>>', lambda event: self.on_field_changed('is_private'),
+                               add='+')
+        self.profile_pic_var.trace_add('write', lambda *args: self.on_field_changed('has_pic'))
+        
         # Result display
         self.result_frame = ttk.LabelFrame(
             self.scrollable_frame, 
@@ -260,7 +424,7 @@ class SmartInstagramAuthenticityApp:
         self.result_frame.pack(fill=tk.X, padx=20, pady=10, expand=True)
         
         self.result_text = tk.StringVar()
-        self.result_text.set("Enter account details and click 'Analyze Account'")
+        self.result_text.set(IDLE_MESSAGE)
         
         self.result_label = ttk.Label(
             self.result_frame,
@@ -305,87 +469,194 @@ class SmartInstagramAuthenticityApp:
 
     def extract_features(self, username, fullname, bio, has_pic, is_private, posts, followers, following):
         """Extract all required features from user inputs"""
-        features = {}
-        
-        # Profile picture
-        features['profile pic'] = 1 if has_pic else 0
-        
-        # Username features
-        features['nums/length username'] = self.calculate_numeric_ratio(username)
-        
-        # Fullname features
-        name_parts = fullname.split()
-        features['fullname words'] = len(name_parts)
-        features['nums/length fullname'] = self.calculate_numeric_ratio(fullname)
-        features['name==username'] = 1 if username.lower() == fullname.lower().replace(" ", "") else 0
-        
-        # Bio features
-        features['description length'] = len(bio)
-        features['external URL'] = 1 if re.search(r'http[s]?://', bio) else 0
-        
-        # Account settings
-        features['private'] = 1 if is_private == "Private" else 0
-        
-        # Activity metrics
-        features['#posts'] = int(posts) if posts else 0
-        features['#followers'] = int(followers) if followers else 0
-        features['#follows'] = int(following) if following else 0
-        
-        return features
+        import features
+        return features.extract_features(
+            username, fullname, bio, has_pic, is_private,
+            posts, followers, following
+        )
     
     def calculate_numeric_ratio(self, text):
         """Calculate ratio of numeric characters in a string"""
-        if not text:
-            return 0.0
-        
-        numeric_chars = sum(1 for char in text if char.isdigit())
-        return round(numeric_chars / len(text), 4)
+        import features
+        return features.calculate_numeric_ratio(text)
+    
+    def read_inputs(self):
+        """Current form values, in extract_features argument order"""
+        return (
+            self.username_entry.get().strip(),
+            self.fullname_entry.get().strip(),
+            self.bio_text.get("1.0", tk.END).strip(),
+            self.profile_pic_var.get(),
+            self.account_type.get(),
+            self.posts_entry.get(),
+            self.followers_entry.get(),
+            self.following_entry.get()
+        )
     
     def analyze_account(self):
         """Analyze the account based on user inputs"""
+        if self.model is None:
+            return
+        
         try:
             # Get all inputs
-            username = self.username_entry.get().strip()
-            fullname = self.fullname_entry.get().strip()
-            bio = self.bio_text.get("1.0", tk.END).strip()
-            has_pic = self.profile_pic_var.get()
-            is_private = self.account_type.get()
-            posts = self.posts_entry.get()
-            followers = self.followers_entry.get()
-            following = self.following_entry.get()
+            username, fullname, bio, has_pic, is_private, posts, followers, following = self.read_inputs()
             
             # Validate required fields
-            if not username:
-                raise ValueError("Please enter a username")
-            if not fullname:
-                raise ValueError("Please enter a full name")
-            if not (posts and followers and following):
-                raise ValueError("Please enter post, follower, and following counts")
-            
-            # Extract features
+            with stage('validate'):
+                if not username:
+                    raise ValueError("Please enter a username")
+                if not fullname:
+                    raise ValueError("Please enter a full name")
+                if not (posts and followers and following):
+                    raise ValueError("Please enter post, follower, and following counts")
+        except ValueError as e:
+            messagebox.showerror("Input Error", str(e))
+            return
+        
+        # A newer click supersedes anything still queued or running
+        self.cancel_pending_analysis()
+        self._pending = self.executor.submit(
+            self._score_account,
+            username, fullname, bio, has_pic, is_private,
+            posts, followers, following
+        )
+        self.set_busy(True)
+        self.root.after(POLL_MS, self._check_analysis, self._request_id, self._pending)
+    
+    def _score_account(self, username, fullname, bio, has_pic, is_private, posts, followers, following):
+        """Extract features and score them (runs on the worker thread)"""
+        with stage('extract_features'):
             features = self.extract_features(
                 username, fullname, bio, has_pic, is_private, 
                 posts, followers, following
             )
-            
-            # Create DataFrame for prediction
-            input_df = pd.DataFrame([features])
-            
-            # Make prediction
-            prediction = self.model.predict(input_df)[0]
-            probabilities = self.model.predict_proba(input_df)[0]
-            confidence = max(probabilities) * 100
-            
-            # Display results
-            self.update_result_display(prediction, confidence)
-            
-            # Create visualizations
-            self.create_visualizations(prediction, confidence, features)
-            
+        
+        # Make prediction (re-checked accounts come from the cache)
+        prediction, confidence, _ = self.score_cache.get_or_score(
+            features, lambda: self.score_features(features)
+        )
+        return prediction, confidence, features
+    
+    def on_field_changed(self, field):
+        """Note an edited field and, in live mode, rescore once typing pauses"""
+        self._dirty_fields.add(field)
+        if self.live_var.get():
+            self.schedule_live_update(full=False)
+    
+    def schedule_live_update(self, full=True):
+        """Debounce a live rescore; full=True recomputes every feature"""
+        if full:
+            self._live_features = None
+        if self._live_after is not None:
+            self.root.after_cancel(self._live_after)
+            self._live_after = None
+        if self.live_var.get():
+            self._live_after = self.root.after(LIVE_DEBOUNCE_MS, self._live_update)
+    
+    def _live_update(self):
+        """Recompute the features of the edited fields and rescore on the UI thread"""
+        self._live_after = None
+        if self.model is None:
+            return
+        
+        import features
+        
+        inputs = self.read_inputs()
+        username, fullname, _, _, _, posts, followers, following = inputs
+        # Half-typed forms keep showing the last verdict
+        if not (username and fullname and posts and followers and following):
+            return
+        
+        if self._live_features is None:
+            fields = INPUT_FIELDS
+            self._live_features = dict.fromkeys(features.FEATURE_COLUMNS, 0)
+        else:
+            fields = self._dirty_fields
+        try:
+            with stage('extract_features'):
+                features.update_features(self._live_features, fields, *inputs)
+        except ValueError:
+            # A count that isn't a number yet; retry these fields after the next edit
+            self._live_features = None
+            return
+        self._dirty_fields = set()
+        
+        current = dict(self._live_features)
+        # A single record scores in well under a millisecond, so no worker round trip
+        prediction, confidence, _ = self.score_cache.get_or_score(
+            current, lambda: self.score_features(current, self.live_scorer)
+        )
+        self._live_result = (prediction, confidence, current)
+        self._request_redraw()
+    
+    def _request_redraw(self):
+        """Redraw at most once per frame, always with the newest live result"""
+        if self._redraw_after is not None:
+            return
+        wait = FRAME_MS - (time.perf_counter() - self._last_redraw) * 1000
+        self._redraw_after = self.root.after(max(0, int(wait)), self._redraw_live)
+    
+    def _redraw_live(self):
+        self._redraw_after = None
+        self._last_redraw = time.perf_counter()
+        if self._live_result is not None:
+            self.show_result(*self._live_result)
+    
+    def _check_analysis(self, request_id, future):
+        """Hand a finished analysis to the UI, dropping results of superseded requests"""
+        if request_id != self._request_id:
+            return
+        if not future.done():
+            self.root.after(POLL_MS, self._check_analysis, request_id, future)
+            return
+        
+        self._pending = None
+        self.set_busy(False)
+        try:
+            prediction, confidence, features = future.result()
         except ValueError as e:
             messagebox.showerror("Input Error", str(e))
+            return
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            return
+        
+        self.show_result(prediction, confidence, features)
+    
+    def cancel_pending_analysis(self):
+        """Invalidate the in-flight analysis so its result is never shown"""
+        self._request_id += 1
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        self.set_busy(False)
+    
+    def set_busy(self, busy):
+        """Show or hide the busy indicator"""
+        if busy:
+            self.busy_indicator.pack(side=tk.LEFT, padx=10, after=self.analyze_button)
+            self.busy_indicator.start(10)
+        else:
+            self.busy_indicator.stop()
+            self.busy_indicator.pack_forget()
+    
+    def show_result(self, prediction, confidence, features):
+        """Update the display, redrawing charts only when the result changed"""
+        result = (prediction, round(confidence, 1), tuple(features.values()))
+        if result == self._last_result:
+            return
+        self._last_result = result
+        
+        # Display results
+        self.update_result_display(prediction, confidence)
+        
+        # Create visualizations
+        self.create_visualizations(prediction, confidence, features)
+    
+    def score_features(self, features, scorer=None):
+        """Run the model on one feature dict (with the worker thread's scorer by default)"""
+        return (scorer or self.record_scorer).score(features)
     
     def update_result_display(self, prediction, confidence):
         """Update the result display with prediction"""
@@ -401,31 +672,43 @@ class SmartInstagramAuthenticityApp:
         self.confidence_meter['value'] = confidence
         self.confidence_text.set(f"{confidence:.1f}%")
     
+    @timed('create_visualizations')
     def create_visualizations(self, prediction, confidence, features):
-        """Create visualization elements for the results"""
-        # Clear previous visualizations
-        for widget in self.visualization_frame.winfo_children():
-            widget.destroy()
-        
-        # Create visualization container
-        viz_container = ttk.Frame(self.visualization_frame)
-        viz_container.pack(fill=tk.BOTH, expand=True)
-        
-        # Left column - Gauge
-        left_frame = ttk.Frame(viz_container)
-        left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10)
-        
-        self.create_authenticity_gauge(left_frame, confidence, prediction)
-        
-        # Right column - Radar and Bars
-        right_frame = ttk.Frame(viz_container)
-        right_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10)
-        
-        self.create_feature_radar(right_frame, features)
-        self.create_comparison_bars(right_frame, features)
+        """Show the charts for a result, building them on first use"""
+        if self.viz_container is None:
+            self.viz_container = ttk.Frame(self.visualization_frame)
+            
+            # Left column - Gauge
+            left_frame = ttk.Frame(self.viz_container)
+            left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10)
+            
+            self.create_authenticity_gauge(left_frame)
+            
+            # Right column - Radar and Bars
+            right_frame = ttk.Frame(self.viz_container)
+            right_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10)
+            
+            self.create_feature_radar(right_frame)
+            self.create_comparison_bars(right_frame)
+        
+        if not self.viz_container.winfo_manager():
+            self.viz_container.pack(fill=tk.BOTH, expand=True)
+        
+        # Charts are only redrawn in place from here on
+        with stage('explain'):
+            contributions = self.live_scorer.explain(features)
+        self.update_authenticity_gauge(confidence, prediction)
+        self.update_feature_radar(contributions)
+        self.update_comparison_bars(contributions)
     
-    def create_authenticity_gauge(self, parent, confidence, prediction):
-        """Create an authenticity gauge visualization"""
+    def hide_visualizations(self):
+        """Hide the charts, keeping their canvases for the next result"""
+        if self.viz_container is not None:
+            self.viz_container.pack_forget()
+    
+    @timed('create_authenticity_gauge')
+    def create_authenticity_gauge(self, parent):
+        """Create the authenticity gauge; its values are set by update_authenticity_gauge"""
         gauge_frame = ttk.Frame(parent)
         gauge_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
@@ -443,46 +726,52 @@ class SmartInstagramAuthenticityApp:
         canvas.create_arc(10, 10, 190, 190, start=0, extent=180, 
                          outline='gray', width=2, style=tk.ARC)
         
-        # Calculate angle based on confidence (0-100 to 0-180)
-        angle = 180 * (confidence/100)
-        
-        # Determine color based on prediction
-        fill_color = self.colors['success'] if prediction == 0 else self.colors['danger']
-        
-        # Draw gauge indicator
-        canvas.create_arc(10, 10, 190, 190, start=0, extent=angle, 
-                         outline=fill_color, width=20, style=tk.ARC)
-        
-        # Add labels
-        canvas.create_text(100, 80, text=f"{confidence:.1f}%", 
-                          font=('Helvetica', 16, 'bold'))
+        # Gauge indicator, confidence and status are updated for every result
+        self.gauge_arc = canvas.create_arc(10, 10, 190, 190, start=0, extent=0, 
+                                           width=20, style=tk.ARC)
+        self.gauge_text = canvas.create_text(100, 80, font=('Helvetica', 16, 'bold'))
         canvas.create_text(50, 170, text="Low", font=('Helvetica', 10))
         canvas.create_text(150, 170, text="High", font=('Helvetica', 10))
-        
-        # Add status label
+        self.gauge_status = canvas.create_text(100, 120, font=('Helvetica', 12, 'bold'))
+        self.gauge_canvas = canvas
+    
+    @timed('update_authenticity_gauge')
+    def update_authenticity_gauge(self, confidence, prediction):
+        """Point the gauge at a new confidence"""
+        # Determine color based on prediction
+        fill_color = self.colors['success'] if prediction == 0 else self.colors['danger']
         status = "Genuine" if prediction == 0 else "Fake"
-        canvas.create_text(100, 120, text=status, 
-                          font=('Helvetica', 12, 'bold'), fill=fill_color)
+        
+        # Calculate angle based on confidence (0-100 to 0-180)
+        canvas = self.gauge_canvas
+        canvas.itemconfigure(self.gauge_arc, extent=180 * (confidence/100), outline=fill_color)
+        canvas.itemconfigure(self.gauge_text, text=f"{confidence:.1f}%")
+        canvas.itemconfigure(self.gauge_status, text=status, fill=fill_color)
     
-    def create_feature_radar(self, parent, features):
-        """Create a radar chart for key features"""
+    def radar_values(self, contributions):
+        """Summed contributions per RADAR_GROUPS axis, mapped to 0-1 with 0.5 as neutral"""
+        values = []
+        for _, columns in RADAR_GROUPS:
+            total = sum(contributions[column] for column in columns)
+            values.append(0.5 + max(-0.5, min(0.5, total / MAX_CONTRIBUTION / 2)))
+        return values
+    
+    @timed('create_feature_radar')
+    def create_feature_radar(self, parent):
+        """Create the radar chart axes; the data polygon is set by update_feature_radar"""
         radar_frame = ttk.Frame(parent)
         radar_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
         ttk.Label(
             radar_frame,
-            text="Feature Analysis",
+            text="Why the Model Decided",
             font=('Helvetica', 12, 'bold')
         ).pack()
-        
-        # Select key features to visualize
-        key_features = {
-            'Numeric Ratio': min(1, features['nums/length username'] * 10),
-            'Follower Ratio': min(1, features['#followers'] / (features['#follows'] + 1) / 100),
-            'Bio Length': min(1, features['description length'] / 200),
-            'Post Count': min(1, features['#posts'] / 1000),
-            'Has Profile Pic': features['profile pic']
-        }
+        ttk.Label(
+            radar_frame,
+            text="Outside the middle ring: towards fake; inside: towards genuine",
+            font=('Helvetica', 8)
+        ).pack()
         
         # Create canvas
         canvas = tk.Canvas(radar_frame, width=250, height=200, bg=self.colors['background'])
@@ -491,52 +780,56 @@ class SmartInstagramAuthenticityApp:
         # Radar chart parameters
         center_x, center_y = 125, 100
         radius = 80
-        num_features = len(key_features)
-        angle_step = 2 * math.pi / num_features
+        angle_step = 2 * math.pi / len(RADAR_LABELS)
+        # Unit vector of each axis, reused for every polygon
+        self.radar_axes = [
+            (math.cos(i * angle_step - math.pi/2), math.sin(i * angle_step - math.pi/2))
+            for i in range(len(RADAR_LABELS))
+        ]
+        self.radar_center = (center_x, center_y, radius)
         
         # Draw axes and labels
-        for i, (name, value) in enumerate(key_features.items()):
-            angle = i * angle_step - math.pi/2
-            end_x = center_x + radius * math.cos(angle)
-            end_y = center_y + radius * math.sin(angle)
-            
+        for name, (dx, dy) in zip(RADAR_LABELS, self.radar_axes):
             # Draw axis line
-            canvas.create_line(center_x, center_y, end_x, end_y, fill='gray')
+            canvas.create_line(center_x, center_y, center_x + radius * dx, center_y + radius * dy,
+                               fill='gray')
             
             # Draw feature name
-            label_x = center_x + (radius + 20) * math.cos(angle)
-            label_y = center_y + (radius + 20) * math.sin(angle)
-            canvas.create_text(label_x, label_y, text=name, 
-                              font=('Helvetica', 8))
-        
-        # Draw data polygon
-        points = []
-        for i, (_, value) in enumerate(key_features.items()):
-            angle = i * angle_step - math.pi/2
-            value_radius = radius * value
-            x = center_x + value_radius * math.cos(angle)
-            y = center_y + value_radius * math.sin(angle)
-            points.extend([x, y])
+            canvas.create_text(center_x + (radius + 20) * dx, center_y + (radius + 20) * dy,
+                               text=name, font=('Helvetica', 8))
         
-        canvas.create_polygon(points, fill=self.colors['primary'], 
-                            outline=self.colors['secondary'], width=2, stipple="gray50")
+        # Data polygon, collapsed onto the centre until the first result
+        self.radar_polygon = canvas.create_polygon(
+            [center_x, center_y] * len(RADAR_LABELS), fill=self.colors['primary'], 
+            outline=self.colors['secondary'], width=2, stipple="gray50")
         
-        # Draw scale circles
+        # Draw scale circles; the middle one is "no effect"
         for r in [0.25, 0.5, 0.75, 1.0]:
             canvas.create_oval(
                 center_x - radius*r, center_y - radius*r,
                 center_x + radius*r, center_y + radius*r,
-                outline='lightgray'
+                outline='gray' if r == 0.5 else 'lightgray'
             )
+        self.radar_canvas = canvas
     
-    def create_comparison_bars(self, parent, features):
-        """Create comparison bars for key metrics"""
+    @timed('update_feature_radar')
+    def update_feature_radar(self, contributions):
+        """Reshape the radar polygon for new feature contributions"""
+        center_x, center_y, radius = self.radar_center
+        points = []
+        for value, (dx, dy) in zip(self.radar_values(contributions), self.radar_axes):
+            points.extend([center_x + radius * value * dx, center_y + radius * value * dy])
+        self.radar_canvas.coords(self.radar_polygon, *points)
+    
+    @timed('create_comparison_bars')
+    def create_comparison_bars(self, parent):
+        """Create the top-reasons bar chart; bars and labels are set by update_comparison_bars"""
         bar_frame = ttk.Frame(parent)
         bar_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
         ttk.Label(
             bar_frame,
-            text="Account Metrics",
+            text="Top Reasons",
             font=('Helvetica', 12, 'bold')
         ).pack()
         
@@ -544,48 +837,63 @@ class SmartInstagramAuthenticityApp:
         canvas = tk.Canvas(bar_frame, width=250, height=200, bg=self.colors['background'])
         canvas.pack()
         
-        # Metrics to compare
-        metrics = {
-            'Followers': features['#followers'],
-            'Following': features['#follows'],
-            'Posts': features['#posts']
-        }
-        
-        # Normalize values for display
-        max_val = max(metrics.values()) or 1  # Avoid division by zero
-        norm_metrics = {k: min(1, v/max_val) for k, v in metrics.items()}
-        
-        # Draw bars
+        # Bar layout
         bar_width = 40
         spacing = 60
         base_y = 150
         max_height = 120
+        self.bar_layout = (bar_width, base_y, max_height)
         
-        for i, (name, value) in enumerate(norm_metrics.items()):
+        self.bars = []
+        for i in range(3):
             x0 = 30 + i * spacing
             x1 = x0 + bar_width
-            y0 = base_y - max_height * value
-            y1 = base_y
             
-            # Draw bar
-            color = self.colors['accent'] if i == 0 else self.colors['primary']
-            canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline='')
-            
-            # Draw value
-            canvas.create_text(x0 + bar_width/2, y0 - 10, 
-                             text=f"{metrics[name]:,}", 
-                             font=('Helvetica', 8, 'bold'))
-            
-            # Draw label
-            canvas.create_text(x0 + bar_width/2, base_y + 15, 
-                             text=name, font=('Helvetica', 9))
+            # Bar, value and feature name, all updated for every result
+            bar = canvas.create_rectangle(x0, base_y, x1, base_y, fill=self.colors['primary'], outline='')
+            value = canvas.create_text(x0 + bar_width/2, base_y - 10, 
+                                       font=('Helvetica', 8, 'bold'))
+            name = canvas.create_text(x0 + bar_width/2, base_y + 15, width=spacing - 4,
+                                      font=('Helvetica', 8))
+            self.bars.append((x0, bar, value, name))
             
             # Draw scale markers
             for h in [0.25, 0.5, 0.75, 1.0]:
                 y_pos = base_y - max_height * h
                 canvas.create_line(x0 - 5, y_pos, x0, y_pos, fill='gray')
-                canvas.create_text(x0 - 10, y_pos, text=f"{h*100:.0f}%", 
+                canvas.create_text(x0 - 10, y_pos, text=f"{h * MAX_CONTRIBUTION:.2f}", 
                                   font=('Helvetica', 7), anchor=tk.E)
+        self.bar_canvas = canvas
+    
+    @timed('update_comparison_bars')
+    def update_comparison_bars(self, contributions):
+        """Show the three features that moved the fake probability most, red towards fake"""
+        top = sorted(contributions.items(), key=lambda item: -abs(item[1]))[:len(self.bars)]
+        bar_width, base_y, max_height = self.bar_layout
+        canvas = self.bar_canvas
+        for (x0, bar, value, name), (column, contribution) in zip(self.bars, top):
+            y0 = base_y - max_height * min(1, abs(contribution) / MAX_CONTRIBUTION)
+            color = self.colors['danger'] if contribution > 0 else self.colors['success']
+            canvas.coords(bar, x0, y0, x0 + bar_width, base_y)
+            canvas.itemconfigure(bar, fill=color)
+            canvas.coords(value, x0 + bar_width/2, y0 - 10)
+            canvas.itemconfigure(value, text=f"{contribution:+.2f}")
+            canvas.itemconfigure(name, text=FEATURE_LABELS[column])
+    
+    def import_csv(self):
+        """Score a whole file of raw profiles in a separate results window"""
+        if self.model is None:
+            return
+        
+        path = filedialog.askopenfilename(
+            title="Import accounts",
+            filetypes=[("CSV files", "*.csv"), ("JSON Lines", "*.jsonl"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        
+        from bulk_import import BulkImportWindow
+        BulkImportWindow(self.root, self.model, path, self.colors)
     
     def fill_example(self):
         """Fill form with example data"""
@@ -596,11 +904,15 @@ class SmartInstagramAuthenticityApp:
         self.posts_entry.insert(0, "342")
         self.followers_entry.insert(0, "12500")
         self.following_entry.insert(0, "850")
+        self.schedule_live_update()
         
         messagebox.showinfo("Example Data", "Form filled with example data for analysis.")
     
     def clear_fields(self):
         """Clear all input fields"""
+        self.cancel_pending_analysis()
+        self._last_result = None
+        
         self.username_entry.delete(0, tk.END)
         self.fullname_entry.delete(0, tk.END)
         self.bio_text.delete("1.0", tk.END)
@@ -610,16 +922,34 @@ class SmartInstagramAuthenticityApp:
         self.followers_entry.delete(0, tk.END)
         self.following_entry.delete(0, tk.END)
         
-        self.result_text.set("Enter account details and click 'Analyze Account'")
+        self.result_text.set(IDLE_MESSAGE)
         self.result_label.configure(foreground=self.colors['text'])
         self.confidence_meter['value'] = 0
         self.confidence_text.set("0%")
         
-        # Clear visualizations
-        for widget in self.visualization_frame.winfo_children():
-            widget.destroy()
+        # Hide visualizations
+        self.hide_visualizations()
+        
+        # Forget live state; the reset fields queued callbacks above
+        for after_id in (self._live_after, self._redraw_after):
+            if after_id is not None:
+                self.root.after_cancel(after_id)
+        self._live_after = self._redraw_after = None
+        self._live_features = self._live_result = None
+        self._dirty_fields = set()
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Smart Instagram Checker")
+    parser.add_argument('--model-version', default=None,
+                        help="Registered model version (default: newest, else the pickled model)")
+    parser.add_argument('--metrics-log', default=None,
+                        help="Append per-stage timings as JSON lines to this file")
+    args = parser.parse_args()
+    if args.metrics_log:
+        set_sink(JsonLogSink(args.metrics_log))
+    
     root = tk.Tk()
-    app = SmartInstagramAuthenticityApp(root)
+    app = SmartInstagramAuthenticityApp(root, args.model_version)
     root.mainloop()
@@ -0,0 +1,254 @@
+# benchmark.py
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURE_COLUMNS, extract_features, extract_features_frame
+from scoring import MODEL_PATH, RecordScorer, load_model, resolve_model_path
+
+BASELINE_PATH = 'benchmark_baseline.json'
+SIZES = [1, 1000, 100000, 1000000]
+# Single-call benchmarks are timed this many times
+LATENCY_REPEATS = 200
+# Per-row extract_features is timed on at most this many rows of each size
+MAX_SCALAR_ROWS = 10000
+# A benchmark regresses when it is this much slower than the baseline
+DEFAULT_TOLERANCE = 0.25
+# p99 latency budget for scoring one account through RecordScorer
+SINGLE_RECORD_TARGET_MS = 1.0
+# The target is checked on this many score_record calls per run, best p99 of several runs,
+# so a single scheduler stall can't decide it
+RECORD_LATENCY_CALLS = 5000
+RECORD_LATENCY_RUNS = 3
+# Largest probability difference allowed between RecordScorer and the DataFrame path
+PARITY_TOLERANCE = 1e-9
+
+
+def _mixed_string(rng, length, digits):
+    """Random lowercase string of the given length with `digits` of its characters numeric"""
+    chars = rng.choices(string.ascii_lowercase, k=length - digits) + rng.choices(string.digits, k=digits)
+    rng.shuffle(chars)
+    return ''.join(chars)
+
+
+def synthetic_profiles(n, train_path='Data/train.csv', seed=42):
+    """Raw profiles whose extracted features follow the distribution of train_path"""
+    rng = random.Random(seed)
+    rows = pd.read_csv(train_path).sample(n, replace=True, random_state=seed).reset_index(drop=True)
+
+    usernames, fullnames, bios = [], [], []
+    columns = ['nums/length username', 'name==username', 'fullname words', 'nums/length fullname',
+               'description length', 'external URL']
+    for username_ratio, same_name, words, fullname_ratio, bio_length, has_url in zip(
+            *(rows[column] for column in columns)):
+        length = int(rng.randint(6, 15))
+        username = _mixed_string(rng, length, int(round(username_ratio * length)))
+
+        if same_name:
+            fullname = username
+        else:
+            fullname = ' '.join(_mixed_string(rng, int(rng.randint(3, 8)), 0) for _ in range(int(words)))
+            if fullname and fullname_ratio:
+                fullname += ' ' + _mixed_string(rng, 2, 2)
+
+        bio = 'x' * int(bio_length)
+        if has_url:
+            bio = ('https://example.com ' + bio)[:max(len(bio), 8)]
+
+        usernames.append(username)
+        fullnames.append(fullname)
+        bios.append(bio)
+
+    return pd.DataFrame({
+        'username': usernames,
+        'fullname': fullnames,
+        'bio': bios,
+        'has_pic': rows['profile pic'],
+        'is_private': np.where(rows['private'] == 1, 'Private', 'Public'),
+        'posts': rows['#posts'],
+        'followers': rows['#followers'],
+        'following': rows['#follows'],
+    })
+
+
+def score_account(model, profile):
+    """Reference single-account path: extract, build a one-row DataFrame, predict"""
+    features = extract_features(**profile)
+    input_df = pd.DataFrame([features])
+    prediction = model.predict(input_df)[0]
+    probabilities = model.predict_proba(input_df)[0]
+    return prediction, max(probabilities) * 100, probabilities[list(model.classes_).index(1)]
+
+
+def score_record(scorer, profile):
+    """The GUI's single-account path: extract, then one pass through RecordScorer"""
+    return scorer.score(extract_features(**profile))
+
+
+def check_record_parity(model, profiles, tolerance=PARITY_TOLERANCE):
+    """Profiles where RecordScorer disagrees with the DataFrame path"""
+    scorer = RecordScorer(model)
+    mismatches = []
+    for profile in profiles:
+        expected = score_account(model, profile)
+        actual = score_record(scorer, profile)
+        probability_gap = abs(expected[2] - actual[2])
+        # A label may only differ on an exact 50/50 split, where summation order decides
+        tie = abs(expected[2] - 0.5) <= tolerance
+        if probability_gap > tolerance or (expected[0] != actual[0] and not tie):
+            mismatches.append((profile, expected, actual))
+    return mismatches
+
+
+def _time_calls(func, args_list):
+    """Milliseconds taken by each call func(*args) in args_list"""
+    timings = np.empty(len(args_list))
+    for i, args in enumerate(args_list):
+        start = time.perf_counter()
+        func(*args)
+        timings[i] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def summarize(name, rows, timings):
+    """Percentiles of per-call timings and rows scored per second"""
+    return {
+        'benchmark': name,
+        'rows': rows,
+        'calls': len(timings),
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p90_ms': float(np.percentile(timings, 90)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'rows_per_sec': rows * len(timings) / (timings.sum() / 1000),
+    }
+
+
+def run_benchmarks(model, sizes=SIZES, seed=42):
+    """Time extraction and inference at every size; returns a list of summaries"""
+    records = synthetic_profiles(max(sizes + [MAX_SCALAR_ROWS]), seed=seed)
+
+    scalar_rows = records.iloc[:MAX_SCALAR_ROWS].to_dict('records')
+    timings = _time_calls(lambda profile: extract_features(**profile),
+                          [(profile,) for profile in scalar_rows])
+    results = [summarize('extract_features', 1, timings)]
+
+    for size in sizes:
+        profiles = records.iloc[:size].reset_index(drop=True)
+        # Large sizes are timed a few times; small ones often enough for stable percentiles
+        repeats = max(3, min(LATENCY_REPEATS, 100000 // size))
+
+        timings = _time_calls(extract_features_frame, [(profiles,)] * repeats)
+        results.append(summarize('extract_features_frame', size, timings))
+
+        X = extract_features_frame(profiles)[FEATURE_COLUMNS]
+        model.predict_proba(X.iloc[:1])  # warm-up
+        results.append(summarize('predict', size, _time_calls(model.predict, [(X,)] * repeats)))
+        results.append(summarize('predict_proba', size,
+                                 _time_calls(model.predict_proba, [(X,)] * repeats)))
+
+    profiles = records.iloc[:LATENCY_REPEATS].to_dict('records')
+    results.append(summarize('score_account', 1,
+                             _time_calls(score_account, [(model, profile) for profile in profiles])))
+    scorer = RecordScorer(model)
+    score_record(scorer, profiles[0])  # warm-up
+    calls = [(scorer, profiles[i % len(profiles)]) for i in range(RECORD_LATENCY_CALLS)]
+    runs = [_time_calls(score_record, calls) for _ in range(RECORD_LATENCY_RUNS)]
+    best = min(runs, key=lambda timings: np.percentile(timings, 99))
+    results.append(summarize('score_record', 1, best))
+    return results
+
+
+def _key(result):
+    return f"{result['benchmark']}/{result['rows']}"
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Results whose median latency grew by more than tolerance over the baseline"""
+    regressions = []
+    for result in results:
+        previous = baseline.get(_key(result))
+        if previous and result['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            regressions.append((result, previous))
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as f:
+        json.dump({
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'results': {_key(result): result for result in results},
+        }, f, indent=2)
+
+
+def print_results(results, baseline):
+    print(f"{'benchmark':<24} {'rows':>9} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} "
+          f"{'rows/sec':>12} {'vs base':>8}")
+    for result in results:
+        previous = baseline.get(_key(result))
+        change = f"{result['p50_ms'] / previous['p50_ms'] - 1:>+8.0%}" if previous else f"{'-':>8}"
+        print(f"{result['benchmark']:<24} {result['rows']:>9,} {result['p50_ms']:>10.3f} "
+              f"{result['p90_ms']:>10.3f} {result['p99_ms']:>10.3f} "
+              f"{result['rows_per_sec']:>12,.0f} {change}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark feature extraction and scoring")
+    parser.add_argument('-m', '--model', default=MODEL_PATH)
+    parser.add_argument('--model-version', default=None, help="Registered model version to benchmark")
+    parser.add_argument('--sizes', type=int, nargs='*', default=SIZES, help="Synthetic batch sizes")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Stored results to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed median slowdown before a benchmark counts as a regression")
+    args = parser.parse_args(argv)
+
+    model = load_model(resolve_model_path(args.model, args.model_version))
+    mismatches = check_record_parity(model, synthetic_profiles(MAX_SCALAR_ROWS, seed=args.seed)
+                                     .to_dict('records'))
+    for profile, expected, actual in mismatches[:10]:
+        print(f"MISMATCH {profile}: DataFrame path {expected}, RecordScorer {actual}", file=sys.stderr)
+    if mismatches:
+        sys.exit(1)
+
+    results = run_benchmarks(model, args.sizes, args.seed)
+    baseline = load_baseline(args.baseline)
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    for result, previous in regressions:
+        print(f"REGRESSION {_key(result)}: p50 {result['p50_ms']:.3f} ms "
+              f"(baseline {previous['p50_ms']:.3f} ms)", file=sys.stderr)
+
+    record = next(result for result in results if result['benchmark'] == 'score_record')
+    too_slow = record['p99_ms'] > SINGLE_RECORD_TARGET_MS
+    if too_slow:
+        print(f"score_record p99 {record['p99_ms']:.3f} ms exceeds the "
+              f"{SINGLE_RECORD_TARGET_MS} ms target", file=sys.stderr)
+    if regressions or too_slow:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
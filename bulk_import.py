@@ -0,0 +1,231 @@
+# bulk_import.py
+import bisect
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+
+# Rows scored per background chunk
+CHUNK_SIZE = 5000
+# Rows materialized in the Treeview at any time
+VISIBLE_ROWS = 20
+POLL_MS = 50
+
+COLUMNS = [
+    ('row', "#", 70),
+    ('username', "Username", 220),
+    ('verdict', "Verdict", 120),
+    ('confidence', "Confidence", 110),
+    ('fake_probability', "Fake Probability", 130),
+]
+
+
+def count_lines(path):
+    """Cheap upper bound on the number of records, used for the progress bar"""
+    lines = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+    return max(lines, 1)
+
+
+class BulkImportWindow:
+    """Scores a CSV/JSONL file of raw profiles in the background and lists the results"""
+
+    def __init__(self, parent, model, path, colors):
+        self.model = model
+        self.path = path
+        self.colors = colors
+
+        # Scored chunks and the row offset each one starts at
+        self.result_frames = []
+        self.offsets = []
+        self.total_rows = 0
+        self.top_row = 0
+        self.expected_rows = count_lines(path)
+
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._done = False
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"Bulk Analysis - {path}")
+        self.window.geometry("760x560")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.create_widgets()
+
+        threading.Thread(target=self._score_file, daemon=True).start()
+        self.window.after(POLL_MS, self._check_progress)
+
+    def create_widgets(self):
+        """Create the progress bar, virtual results table and export button"""
+        top_frame = ttk.Frame(self.window, padding=10)
+        top_frame.pack(fill=tk.X)
+
+        self.status_text = tk.StringVar()
+        self.status_text.set("Scoring accounts...")
+        ttk.Label(top_frame, textvariable=self.status_text).pack(side=tk.LEFT)
+
+        self.export_button = ttk.Button(
+            top_frame,
+            text="Export CSV",
+            command=self.export_results,
+            state=tk.DISABLED
+        )
+        self.export_button.pack(side=tk.RIGHT)
+
+        self.progress = ttk.Progressbar(
+            self.window,
+            orient='horizontal',
+            mode='determinate',
+            maximum=100
+        )
+        self.progress.pack(fill=tk.X, padx=10)
+
+        table_frame = ttk.Frame(self.window, padding=10)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+
+        # The Treeview only ever holds VISIBLE_ROWS items; the scrollbar maps onto all results
+        self.tree = ttk.Treeview(
+            table_frame,
+            columns=[name for name, _, _ in COLUMNS],
+            show='headings',
+            height=VISIBLE_ROWS,
+            selectmode='browse'
+        )
+        for name, heading, width in COLUMNS:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width, anchor=tk.W if name == 'username' else tk.CENTER)
+        self.tree.tag_configure('fake', foreground=self.colors['danger'])
+        self.tree.tag_configure('genuine', foreground=self.colors['success'])
+
+        self.scrollbar = ttk.Scrollbar(table_frame, orient='vertical', command=self.on_scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.top_row - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.top_row + 3))
+
+    def _score_file(self):
+        """Read and score the file chunk by chunk (runs on a worker thread)"""
+        try:
+            from scoring import read_chunks, score_frame
+
+            for chunk in read_chunks(self.path, CHUNK_SIZE):
+                if self._cancel.is_set():
+                    return
+                self._queue.put(('chunk', score_frame(self.model, chunk)))
+            self._queue.put(('done', None))
+        except Exception as e:
+            self._queue.put(('error', e))
+
+    def _check_progress(self):
+        """Drain finished chunks from the worker and refresh the view"""
+        if self._cancel.is_set():
+            return
+
+        updated = False
+        try:
+            while True:
+                kind, payload = self._queue.get_nowait()
+                if kind == 'chunk':
+                    self.offsets.append(self.total_rows)
+                    self.result_frames.append(payload.reset_index(drop=True))
+                    self.total_rows += len(payload)
+                    updated = True
+                elif kind == 'done':
+                    self._done = True
+                elif kind == 'error':
+                    self._done = True
+                    messagebox.showerror("Error", f"An error occurred: {str(payload)}", parent=self.window)
+        except queue.Empty:
+            pass
+
+        if updated or self._done:
+            self.update_status()
+            self.render()
+        if not self._done:
+            self.window.after(POLL_MS, self._check_progress)
+
+    def update_status(self):
+        if self._done:
+            self.progress['value'] = 100
+            self.status_text.set(f"Scored {self.total_rows:,} accounts")
+            self.export_button.configure(state=tk.NORMAL if self.total_rows else tk.DISABLED)
+        else:
+            self.progress['value'] = min(99, 100 * self.total_rows / self.expected_rows)
+            self.status_text.set(f"Scoring accounts... {self.total_rows:,} done")
+
+    def row_values(self, index):
+        """Display values and tag for one result row, looked up on demand"""
+        chunk = bisect.bisect_right(self.offsets, index) - 1
+        frame = self.result_frames[chunk]
+        row = frame.iloc[index - self.offsets[chunk]]
+
+        fake = row['prediction'] == 1
+        username = row['username'] if 'username' in frame.columns else ''
+        values = (
+            index + 1,
+            username,
+            "Fake" if fake else "Genuine",
+            f"{row['confidence']:.1f}%",
+            f"{row['fake_probability']:.3f}",
+        )
+        return values, ('fake' if fake else 'genuine',)
+
+    def render(self):
+        """Materialize only the rows currently in view"""
+        self.tree.delete(*self.tree.get_children())
+        stop = min(self.top_row + VISIBLE_ROWS, self.total_rows)
+        for index in range(self.top_row, stop):
+            values, tags = self.row_values(index)
+            self.tree.insert('', tk.END, values=values, tags=tags)
+
+        if self.total_rows:
+            self.scrollbar.set(self.top_row / self.total_rows, stop / self.total_rows)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, row):
+        top_row = max(0, min(int(row), self.total_rows - VISIBLE_ROWS))
+        if top_row != self.top_row:
+            self.top_row = top_row
+            self.render()
+
+    def on_scroll(self, action, amount, unit=None):
+        """Scrollbar callback: 'moveto fraction' or 'scroll n units|pages'"""
+        if action == 'moveto':
+            self.scroll_to(float(amount) * self.total_rows)
+        elif action == 'scroll':
+            step = VISIBLE_ROWS if unit == 'pages' else 1
+            self.scroll_to(self.top_row + int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        self.scroll_to(self.top_row - int(event.delta / 120) * 3)
+        return "break"
+
+    def export_results(self):
+        """Write all scored rows back to a CSV file"""
+        path = filedialog.asksaveasfilename(
+            parent=self.window,
+            defaultextension='.csv',
+            filetypes=[("CSV files", "*.csv")]
+        )
+        if not path:
+            return
+
+        import pandas as pd
+
+        try:
+            pd.concat(self.result_frames, ignore_index=True).to_csv(path, index=False)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not export results: {str(e)}", parent=self.window)
+            return
+        messagebox.showinfo("Export Complete", f"Saved {self.total_rows:,} results to {path}", parent=self.window)
+
+    def close(self):
+        """Stop the background scoring and close the window"""
+        self._cancel.set()
+        self.window.destroy()
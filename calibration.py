@@ -0,0 +1,219 @@
+# calibration.py
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURE_COLUMNS
+from file_utils import atomic_write
+
+CALIBRATION_NAME = 'calibration.json'
+METHODS = ('isotonic', 'platt')
+DEFAULT_THRESHOLD = 0.5
+# Cutoffs listed in the threshold table
+THRESHOLDS = np.round(np.linspace(0, 1, 101), 2)
+# The threshold table is built from out-of-fold calibrated probabilities over this many folds
+CROSS_FIT_FOLDS = 5
+
+
+def calibration_path(model_path):
+    """Where the calibration of a model lives: inside a registry version, else next to the file"""
+    if os.path.isdir(model_path):
+        return os.path.join(model_path, CALIBRATION_NAME)
+    return os.path.splitext(model_path)[0] + '.' + CALIBRATION_NAME
+
+
+class Calibration:
+    """Maps the forest's fake probability to a calibrated one, plus a decision threshold
+
+    Isotonic calibrations are stored as breakpoints (linear interpolation
+    between them, as IsotonicRegression predicts); Platt as sigmoid(a * p + b).
+    """
+
+    def __init__(self, method, params, threshold=DEFAULT_THRESHOLD, table=None, holdout_rows=0,
+                 model_version=None):
+        if method not in METHODS:
+            raise ValueError(f"Unknown calibration method: {method}")
+        self.method = method
+        self.params = {name: np.asarray(value, dtype=np.float64) for name, value in params.items()}
+        self.threshold = threshold
+        self.table = table
+        self.holdout_rows = holdout_rows
+        # score_cache.model_version of the model it was fitted for
+        self.model_version = model_version
+
+    def transform(self, probabilities):
+        """Calibrated fake probabilities for an array of raw ones"""
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        if self.method == 'isotonic':
+            return np.interp(probabilities, self.params['x'], self.params['y'])
+        return 1 / (1 + np.exp(-(self.params['a'] * probabilities + self.params['b'])))
+
+    def to_dict(self):
+        return {
+            'method': self.method,
+            'params': {name: value.tolist() for name, value in self.params.items()},
+            'threshold': self.threshold,
+            'holdout_rows': self.holdout_rows,
+            'model_version': self.model_version,
+            'table': self.table.to_dict('records') if self.table is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        table = pd.DataFrame(data['table']) if data.get('table') else None
+        return cls(data['method'], data['params'], data['threshold'], table, data.get('holdout_rows', 0),
+                   data.get('model_version'))
+
+    def save(self, path):
+        with atomic_write(path) as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def load_for(model_path):
+    """The calibration stored with a model, or None if it has none or it belongs to another model"""
+    from score_cache import model_version
+
+    path = calibration_path(model_path)
+    if not os.path.exists(path):
+        return None
+    calibration = Calibration.load(path)
+    # online_training.py rewrites the pickle in place, which leaves its calibration stale
+    if calibration.model_version is not None and calibration.model_version != model_version(model_path):
+        print(f"Ignoring {path}: it was fitted for another version of the model; "
+              f"run 'calibration.py fit' again", file=sys.stderr)
+        return None
+    return calibration
+
+
+def threshold_table(probabilities, labels, thresholds=THRESHOLDS):
+    """Precision, recall and share flagged when flagging probability >= each threshold"""
+    order = np.argsort(probabilities)
+    ranked = np.asarray(probabilities)[order]
+    # Fakes at or above each position of the ascending ranking
+    fakes_from = np.concatenate([np.cumsum(np.asarray(labels)[order][::-1])[::-1], [0]])
+
+    first = np.searchsorted(ranked, thresholds, side='left')
+    flagged = len(ranked) - first
+    true_positives = fakes_from[first]
+    total_fakes = fakes_from[0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(flagged > 0, true_positives / flagged, 1.0)
+        recall = true_positives / total_fakes if total_fakes else np.zeros(len(thresholds))
+    return pd.DataFrame({
+        'threshold': thresholds,
+        'precision': precision,
+        'recall': recall,
+        'flagged_rate': flagged / len(ranked),
+    })
+
+
+def fake_probabilities(model, X):
+    return model.predict_proba(X[FEATURE_COLUMNS])[:, list(model.classes_).index(1)]
+
+
+def _fit_params(method, raw, y):
+    """Isotonic breakpoints or Platt coefficients mapping raw probabilities to labels y"""
+    if method == 'isotonic':
+        from sklearn.isotonic import IsotonicRegression
+
+        isotonic = IsotonicRegression(y_min=0, y_max=1, out_of_bounds='clip').fit(raw, y)
+        params = {'x': isotonic.X_thresholds_, 'y': isotonic.y_thresholds_}
+    elif method == 'platt':
+        from sklearn.linear_model import LogisticRegression
+
+        platt = LogisticRegression(C=1e6).fit(raw.reshape(-1, 1), y)
+        params = {'a': platt.coef_[0, 0], 'b': platt.intercept_[0]}
+    else:
+        raise ValueError(f"Unknown calibration method: {method}")
+    return params
+
+
+def fit(model, X, y, method='isotonic', threshold=DEFAULT_THRESHOLD, folds=CROSS_FIT_FOLDS, seed=42):
+    """Fit a calibration on held-out rows the model was not trained on
+
+    The calibration itself uses every row. Its threshold table is cross-fitted:
+    each fold is calibrated by a fit on the other folds, so the table's precision
+    and recall are not measured on the rows the calibration was fitted to.
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    raw = fake_probabilities(model, X)
+    y = np.asarray(y)
+    calibration = Calibration(method, _fit_params(method, raw, y), threshold, holdout_rows=len(y))
+
+    out_of_fold = np.empty(len(y))
+    for fit_rows, table_rows in StratifiedKFold(folds, shuffle=True, random_state=seed).split(raw, y):
+        fold = Calibration(method, _fit_params(method, raw[fit_rows], y[fit_rows]))
+        out_of_fold[table_rows] = fold.transform(raw[table_rows])
+    calibration.table = threshold_table(out_of_fold, y)
+    return calibration
+
+
+def training_split(data_paths=('Data/train.csv', 'Data/test.csv'), test_size=0.2, seed=42):
+    """(X_train, X_test, y_train, y_test) as model_training.py splits them (same concat and split)"""
+    from sklearn.model_selection import train_test_split
+
+    from dataset_store import read_table
+
+    df = pd.concat([read_table(path) for path in data_paths], axis=0)
+    return train_test_split(df[FEATURE_COLUMNS], df['fake'], test_size=test_size, random_state=seed)
+
+
+def holdout(data_paths=('Data/train.csv', 'Data/test.csv'), test_size=0.2, seed=42):
+    """The rows model_training.py holds out from fitting"""
+    _, X_test, _, y_test = training_split(data_paths, test_size, seed)
+    return X_test, y_test
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate a model's fake probability and tabulate thresholds")
+    parser.add_argument('-m', '--model', default='models/random_forest_model.pkl')
+    parser.add_argument('--model-version', default=None, help="Registered model version to calibrate")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    fit_parser = commands.add_parser('fit', help="Fit on the holdout and store it with the model")
+    fit_parser.add_argument('--method', choices=METHODS, default='isotonic')
+    fit_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help="Default decision threshold on the calibrated probability")
+    fit_parser.add_argument('--data', nargs='*', default=['Data/train.csv', 'Data/test.csv'])
+    fit_parser.add_argument('--test-size', type=float, default=0.2)
+    fit_parser.add_argument('--seed', type=int, default=42)
+
+    table_parser = commands.add_parser('table', help="Print the stored threshold table")
+    table_parser.add_argument('--step', type=float, default=0.05, help="Only show every step")
+    table_parser.add_argument('-o', '--output', default=None, help="Write the full table as CSV")
+    args = parser.parse_args(argv)
+
+    from score_cache import model_version
+    from scoring import load_model, resolve_model_path
+
+    model_path = resolve_model_path(args.model, args.model_version)
+    if args.command == 'fit':
+        X, y = holdout(args.data, args.test_size, args.seed)
+        calibration = fit(load_model(model_path), X, y, args.method, args.threshold, seed=args.seed)
+        calibration.model_version = model_version(model_path)
+        calibration.save(calibration_path(model_path))
+        print(f"Fitted {args.method} calibration on {len(y)} held-out rows, "
+              f"saved to {calibration_path(model_path)}")
+    else:
+        calibration = load_for(model_path)
+        if calibration is None:
+            parser.error(f"{model_path} has no calibration; run 'calibration.py fit' first")
+        table = calibration.table
+        if args.output:
+            table.to_csv(args.output, index=False)
+        shown = np.isclose(np.round(table['threshold'] / args.step) * args.step, table['threshold'])
+        print(table[shown].to_string(index=False, float_format='{:.3f}'.format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+# compiled_forest.py
+import argparse
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+# Rows evaluated at once; bounds the (rows x trees) working set
+BLOCK_SIZE = 1024
+# Trees with at most this many leaves fit the uint64 leaf bitvectors
+MAX_BITVECTOR_LEAVES = 64
+# Arrays making up a compiled forest, in save order
+ARRAY_NAMES = [
+    'feature',
+    'threshold',
+    'children_left',
+    'children_right',
+    'value',
+    'roots',
+    'classes',
+    'feature_names',
+    'max_depth',
+]
+
+# Lookup tables for the bitvector traversal, published together once built
+_BitvectorTables = namedtuple('_BitvectorTables', [
+    'features_used', 'sorted_thresholds', 'table_offsets', 'mask_table',
+    'leaf_value', 'tree_base', 'leaf_node',
+])
+
+
+class CompiledForest:
+    """Random forest flattened into contiguous NumPy arrays for sklearn-free inference"""
+
+    def __init__(self, feature, threshold, children_left, children_right, value,
+                 roots, classes, feature_names, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.feature_names_in_ = feature_names
+        self.n_features_in_ = len(feature_names)
+        self.max_depth = int(max_depth)
+        # Lookup tables are built on first use so loading stays a few mmaps; None until
+        # built, False when the trees are too large for bitvectors
+        self._tables = None
+        self._contribution_tables = {}
+        self._tables_lock = threading.Lock()
+
+    @classmethod
+    def from_model(cls, model):
+        """Flatten a fitted RandomForestClassifier"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left == -1
+
+            # Leaves point back at themselves so every tree can be walked max_depth steps
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+
+            # Per-node class probabilities, as DecisionTreeClassifier.predict_proba
+            counts = tree.value[:, 0, :]
+            values.append(counts / counts.sum(axis=1, keepdims=True))
+
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children_left=np.concatenate(lefts).astype(np.int32),
+            children_right=np.concatenate(rights).astype(np.int32),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.array(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+            feature_names=np.asarray(model.feature_names_in_, dtype=str),
+            max_depth=max(estimator.tree_.max_depth for estimator in model.estimators_),
+        )
+
+    def _arrays(self):
+        return {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'children_left': self.children_left,
+            'children_right': self.children_right,
+            'value': self.value,
+            'roots': self.roots,
+            'classes': self.classes_,
+            'feature_names': self.feature_names_in_,
+            'max_depth': np.array(self.max_depth),
+        }
+
+    def save(self, path):
+        """Write the forest arrays to an .npz file"""
+        np.savez(path, **self._arrays())
+
+    @classmethod
+    def load(cls, path):
+        """Load a forest written by save() or save_arrays()"""
+        if os.path.isdir(path):
+            return cls.load_arrays(path)
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(**{name: arrays[name] for name in ARRAY_NAMES})
+
+    def save_arrays(self, directory):
+        """Write one .npy per array so loaders can memory-map them"""
+        os.makedirs(directory, exist_ok=True)
+        for name, array in self._arrays().items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+
+    @classmethod
+    def load_arrays(cls, directory, mmap_mode='r'):
+        """Load a forest written by save_arrays(); pages are shared between processes"""
+        return cls(**{
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in ARRAY_NAMES
+        })
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def warm(self):
+        """Build the lookup tables now rather than on the first predict; returns self"""
+        self._bitvector_tables()
+        return self
+
+    def _bitvector_tables(self):
+        """The lookup tables, built once even when several threads ask at the same time
+
+        Returns None when the trees are too large for bitvectors.
+        """
+        tables = self._tables
+        if tables is None:
+            with self._tables_lock:
+                tables = self._tables
+                if tables is None:
+                    # Built into locals and published in one assignment
+                    tables = self._tables = self._build_bitvector_tables()
+        return tables or None
+
+    def _build_bitvector_tables(self):
+        """Precompute QuickScorer-style tables: one uint64 per tree with a bit per leaf
+
+        Returns a _BitvectorTables, or False when a tree has too many leaves.
+        """
+        n_nodes = len(self.feature)
+        sizes = np.diff(np.append(self.roots, n_nodes))
+        tree_of = np.repeat(np.arange(self.n_estimators), sizes)
+        node_ids = np.arange(n_nodes)
+        is_leaf = self.children_left == node_ids
+
+        # Number leaves left to right; first_leaf[n] is the leftmost leaf under n
+        first_leaf = np.zeros(n_nodes, dtype=np.int64)
+        leaf_rank = np.full(n_nodes, -1, dtype=np.int64)
+        n_leaves = 0
+        for root in self.roots:
+            rank = 0
+            stack = [int(root)]
+            while stack:
+                node = stack.pop()
+                first_leaf[node] = rank
+                if is_leaf[node]:
+                    leaf_rank[node] = rank
+                    rank += 1
+                else:
+                    stack.append(int(self.children_right[node]))
+                    stack.append(int(self.children_left[node]))
+            n_leaves = max(n_leaves, rank)
+
+        if n_leaves > MAX_BITVECTOR_LEAVES:
+            return False
+
+        # Taking the right branch at a node rules out every leaf of its left subtree
+        internal = node_ids[~is_leaf]
+        all_bits = (1 << MAX_BITVECTOR_LEAVES) - 1
+        masks = np.array([
+            all_bits ^ ((1 << int(end)) - (1 << int(start)))
+            for start, end in zip(first_leaf[self.children_left[internal]],
+                                  first_leaf[self.children_right[internal]])
+        ], dtype=np.uint64)
+
+        # For each feature, the nodes a value exceeds form a prefix of the sorted thresholds,
+        # so the AND of their masks can be looked up instead of walking the trees
+        order = np.lexsort((self.threshold[internal], self.feature[internal]))
+        internal, masks = internal[order], masks[order]
+        features_used, counts = np.unique(self.feature[internal], return_counts=True)
+        mask_table = np.empty((len(internal) + len(counts), self.n_estimators), dtype=np.uint64)
+        sorted_thresholds, table_offsets = [], []
+        row = 0
+        for start, count in zip(np.cumsum(counts) - counts, counts):
+            current = np.full(self.n_estimators, all_bits, dtype=np.uint64)
+            table_offsets.append(row)
+            mask_table[row] = current
+            for node, mask in zip(internal[start:start + count], masks[start:start + count]):
+                row += 1
+                current[tree_of[node]] &= mask
+                mask_table[row] = current
+            row += 1
+            sorted_thresholds.append(self.threshold[internal[start:start + count]])
+
+        # One contiguous row per class keeps the final gathers one-dimensional
+        leaf_value = np.zeros((len(self.classes_), self.n_estimators * MAX_BITVECTOR_LEAVES))
+        leaves = node_ids[is_leaf]
+        slots = tree_of[leaves] * MAX_BITVECTOR_LEAVES + leaf_rank[leaves]
+        leaf_value[:, slots] = self.value[leaves].T
+        # Node id of each leaf slot, for lookups keyed by node (e.g. contributions)
+        leaf_node = np.zeros(self.n_estimators * MAX_BITVECTOR_LEAVES, dtype=np.int64)
+        leaf_node[slots] = leaves
+        return _BitvectorTables(
+            features_used=features_used,
+            sorted_thresholds=sorted_thresholds,
+            table_offsets=table_offsets,
+            mask_table=mask_table,
+            leaf_value=leaf_value,
+            tree_base=np.arange(self.n_estimators) * MAX_BITVECTOR_LEAVES,
+            leaf_node=leaf_node,
+        )
+
+    def prune(self, max_depth=None, n_trees=None):
+        """Smaller forest: the first n_trees trees, each cut off at max_depth
+
+        Nodes at the depth limit become leaves carrying their class distribution.
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        depth_reached = 0
+
+        for root in self.roots[:n_trees]:
+            roots.append(len(features))
+            # (old node, depth, new parent id, child pointer list to fill)
+            stack = [(int(root), 0, -1, None)]
+            while stack:
+                node, depth, parent, pointers = stack.pop()
+                new_id = len(features)
+                if parent >= 0:
+                    pointers[parent] = new_id
+
+                values.append(self.value[node])
+                depth_reached = max(depth_reached, depth)
+                if self.children_left[node] == node or (max_depth is not None and depth >= max_depth):
+                    features.append(0)
+                    thresholds.append(0.0)
+                    lefts.append(new_id)
+                    rights.append(new_id)
+                else:
+                    features.append(self.feature[node])
+                    thresholds.append(self.threshold[node])
+                    lefts.append(-1)
+                    rights.append(-1)
+                    # Right pushed first so left subtrees keep the lower ids
+                    stack.append((int(self.children_right[node]), depth + 1, new_id, rights))
+                    stack.append((int(self.children_left[node]), depth + 1, new_id, lefts))
+
+        return CompiledForest(
+            feature=np.array(features, dtype=np.int32),
+            threshold=np.array(thresholds, dtype=np.float64),
+            children_left=np.array(lefts, dtype=np.int32),
+            children_right=np.array(rights, dtype=np.int32),
+            value=np.array(values, dtype=np.float64),
+            roots=np.array(roots, dtype=np.int32),
+            classes=self.classes_,
+            feature_names=self.feature_names_in_,
+            max_depth=depth_reached,
+        )
+
+    def _as_array(self, X):
+        """Order columns like the training data and cast to float32 as sklearn does"""
+        if hasattr(X, 'columns'):
+            X = X[list(self.feature_names_in_)]
+        return np.asarray(X, dtype=np.float32)
+
+    def _apply_block(self, X):
+        """Leaf node index per (row, tree) for one block of rows"""
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.repeat(self.roots[None, :], X.shape[0], axis=0)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        return nodes
+
+    def apply(self, X):
+        """Return the leaf reached in every tree for every row"""
+        X = self._as_array(X)
+        return np.concatenate([
+            self._apply_block(X[start:start + BLOCK_SIZE])
+            for start in range(0, max(len(X), 1), BLOCK_SIZE)
+        ])
+
+    def _leaf_slots_block(self, X, tables):
+        """Exit leaf per (row, tree) for one block, as an index into the bitvector leaf slots"""
+        X = X.astype(np.float64)
+        alive = None
+        for feature, thresholds, offset in zip(tables.features_used, tables.sorted_thresholds,
+                                               tables.table_offsets):
+            masks = tables.mask_table[np.searchsorted(thresholds, X[:, feature]) + offset]
+            alive = masks if alive is None else np.bitwise_and(alive, masks, out=alive)
+        if alive is None:
+            alive = np.ones((len(X), self.n_estimators), dtype=np.uint64)
+
+        # The exit leaf is the lowest surviving bit; frexp(2**k) has exponent k + 1
+        lowest = alive & (~alive + np.uint64(1))
+        _, exponent = np.frexp(lowest)
+        return tables.tree_base + (exponent - 1)
+
+    def _leaf_sums_block(self, X, tables):
+        """Sum of leaf class probabilities over all trees for one block of rows"""
+        if tables is None:
+            return self.value[self._apply_block(X)].sum(axis=1)
+
+        leaves = self._leaf_slots_block(X, tables)
+        return np.stack([np.take(values, leaves).sum(axis=1) for values in tables.leaf_value], axis=1)
+
+    def _path_contribution_table(self, class_index):
+        """(features, nodes): change in the class value each feature's splits make from root to node"""
+        class_value = self.value[:, class_index]
+        table = np.zeros((self.n_features_in_, len(self.feature)))
+        frontier = np.asarray(self.roots)
+        for _ in range(self.max_depth):
+            frontier = frontier[self.children_left[frontier] != frontier]
+            children = []
+            for child in (self.children_left[frontier], self.children_right[frontier]):
+                table[:, child] = table[:, frontier]
+                table[self.feature[frontier], child] += class_value[child] - class_value[frontier]
+                children.append(child)
+            frontier = np.concatenate(children)
+        return table
+
+    def contributions(self, X, class_index=1):
+        """Decision-path attribution of one class probability (Saabas)
+
+        Every split on a row's path credits its feature with the change in the
+        class probability from parent to child. Returns (bias, contributions):
+        bias is the forest's mean root value and bias + contributions.sum(axis=1)
+        equals predict_proba(X)[:, class_index].
+        """
+        tables = self._bitvector_tables()
+        # A leaf's contributions only depend on its path, so they are tabulated once per class
+        table = self._contribution_tables.get(class_index)
+        if table is None:
+            with self._tables_lock:
+                table = self._contribution_tables.get(class_index)
+                if table is None:
+                    table = self._path_contribution_table(class_index)
+                    self._contribution_tables = {**self._contribution_tables, class_index: table}
+
+        X = self._as_array(X)
+        contributions = np.empty((len(X), self.n_features_in_))
+        for start in range(0, len(X), BLOCK_SIZE):
+            block = X[start:start + BLOCK_SIZE]
+            if tables is not None:
+                leaves = tables.leaf_node[self._leaf_slots_block(block, tables)]
+            else:
+                leaves = self._apply_block(block)
+            contributions[start:start + BLOCK_SIZE] = np.stack(
+                [np.take(column, leaves).sum(axis=1) for column in table], axis=1)
+        bias = float(self.value[self.roots, class_index].mean())
+        return bias, contributions / self.n_estimators
+
+    def predict_proba(self, X):
+        """Average the leaf class probabilities over all trees"""
+        X = self._as_array(X)
+        tables = self._bitvector_tables()
+        proba = np.empty((len(X), len(self.classes_)))
+        for start in range(0, len(X), BLOCK_SIZE):
+            proba[start:start + BLOCK_SIZE] = self._leaf_sums_block(X[start:start + BLOCK_SIZE], tables)
+        return proba / self.n_estimators
+
+    def predict(self, X):
+        """Predict the most probable class for each row"""
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def export_forest(model_path, output_path):
+    """Flatten a pickled forest and save it as arrays"""
+    import joblib
+
+    compiled = CompiledForest.from_model(joblib.load(model_path))
+    compiled.save(output_path)
+    return compiled
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the random forest as flat NumPy arrays")
+    parser.add_argument('model', nargs='?', default='models/random_forest_model.pkl')
+    parser.add_argument('output', nargs='?', default='models/random_forest_model.npz')
+    parser.add_argument('--check', default='Data/test.csv',
+                        help="CSV whose rows are used to compare against sklearn's predict_proba")
+    args = parser.parse_args(argv)
+
+    compiled = export_forest(args.model, args.output)
+    print(f"Exported {compiled.n_estimators} trees ({len(compiled.feature)} nodes) to {args.output}")
+
+    if args.check:
+        import joblib
+        import pandas as pd
+
+        model = joblib.load(args.model)
+        X = pd.read_csv(args.check)[list(compiled.feature_names_in_)]
+        difference = np.abs(model.predict_proba(X) - compiled.predict_proba(X)).max()
+        print(f"Max |predict_proba difference| on {args.check}: {difference:.2e}")
+
+
+if __name__ == "__main__":
+    main()
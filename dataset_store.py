@@ -0,0 +1,219 @@
+# dataset_store.py
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURE_COLUMNS
+from file_utils import atomic_write
+from model_registry import hash_files
+
+STORE_DIR = 'Data/store'
+MANIFEST_NAME = 'manifest.json'
+OBJECTS_DIR = 'objects'
+TARGET = 'fake'
+# Part of every array directory's name, so a conversion with a different column layout
+# (e.g. before id columns were stored) is never reused
+LAYOUT_VERSION = 2
+
+# Smallest types that hold each column: flags, ratios, then counts and lengths
+COLUMN_TYPES = {
+    'profile pic': np.uint8,
+    'nums/length username': np.float32,
+    'fullname words': np.uint32,
+    'nums/length fullname': np.float32,
+    'name==username': np.uint8,
+    'description length': np.uint32,
+    'external URL': np.uint8,
+    'private': np.uint8,
+    '#posts': np.uint32,
+    '#followers': np.uint32,
+    '#follows': np.uint32,
+    TARGET: np.uint8,
+}
+
+
+def dataset_name(path):
+    """Store name for a source file: its base name without extension"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def is_dataset(path):
+    return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+
+def read_manifest(path):
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        return json.load(f)
+
+
+def data_dir(path):
+    """Content-addressed directory holding a dataset's arrays"""
+    store_dir = os.path.dirname(os.path.normpath(path))
+    manifest = read_manifest(path)
+    return os.path.join(store_dir, OBJECTS_DIR, manifest.get('object', manifest['sha256'][:16]))
+
+
+def _column_file(directory, index):
+    # Column names contain '/' and '#', so files are numbered in manifest order
+    return os.path.join(directory, f"column_{index:02d}.npy")
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _typed_column(values, name):
+    """One column cast to its store type; integers outside the type's range are clipped, not wrapped"""
+    dtype = np.dtype(COLUMN_TYPES[name])
+    if dtype.kind not in 'ui':
+        return values.to_numpy(dtype=dtype)
+    values = values.to_numpy(dtype=np.float64)
+    if not np.isfinite(values).all():
+        raise ValueError(f"Column {name!r} has missing or non-numeric values")
+    limits = np.iinfo(dtype)
+    outside = int(np.count_nonzero((values < limits.min) | (values > limits.max)))
+    if outside:
+        print(f"Clipping {outside} values of {name!r} to [{limits.min}, {limits.max}]", file=sys.stderr)
+        values = np.clip(values, limits.min, limits.max)
+    return values.astype(dtype)
+
+
+def _typed_chunks(csv_path, chunksize):
+    """Id, feature and label columns of a CSV, cast chunk by chunk to their store types"""
+    from scoring import ID_FIELDS, features_from_frame, read_chunks
+
+    for chunk in read_chunks(csv_path, chunksize):
+        # Ids are kept as text (e.g. usernames like "00123") so scored output can name the rows
+        typed = {field: chunk[field].astype(str).to_numpy(dtype=str)
+                 for field in ID_FIELDS if field in chunk.columns}
+        columns = features_from_frame(chunk)
+        typed.update((name, _typed_column(columns[name], name)) for name in FEATURE_COLUMNS)
+        if TARGET in chunk.columns:
+            typed[TARGET] = _typed_column(chunk[TARGET], TARGET)
+        yield typed
+
+
+def _write_arrays(csv_path, directory, chunksize):
+    """Write typed .npy columns for csv_path; returns (rows, [[column, dtype], ...])"""
+    chunks = list(_typed_chunks(csv_path, chunksize))
+    if not chunks:
+        raise ValueError(f"{csv_path} has no rows")
+    columns = list(chunks[0])
+    for index, column in enumerate(columns):
+        np.save(_column_file(directory, index), np.concatenate([chunk[column] for chunk in chunks]))
+    rows = int(sum(len(chunk[columns[0]]) for chunk in chunks))
+    # Text columns are as wide as their longest value, so their type is recorded as plain 'str'
+    return rows, [[column, 'str' if column not in COLUMN_TYPES else np.dtype(COLUMN_TYPES[column]).name]
+                  for column in columns]
+
+
+def convert(csv_path, store_dir=STORE_DIR, name=None, chunksize=100000):
+    """Convert a CSV (feature columns or raw profiles) into typed .npy columns
+
+    Arrays live under objects/<content hash>, so files with identical content
+    (e.g. insta_train.csv and train.csv) are stored once. Returns the dataset
+    directory and whether new arrays were written.
+    """
+    name = name or dataset_name(csv_path)
+    digest = hash_files([csv_path])
+    objects = os.path.join(store_dir, OBJECTS_DIR)
+    object_name = f"{digest[:16]}-v{LAYOUT_VERSION}"
+    arrays = os.path.join(objects, object_name)
+    os.makedirs(objects, exist_ok=True)
+
+    created = not os.path.isdir(arrays)
+    if created:
+        # Build in a scratch directory and rename, so readers never see partial arrays
+        scratch = tempfile.mkdtemp(prefix='.tmp-', dir=objects)
+        try:
+            rows, columns = _write_arrays(csv_path, scratch, chunksize)
+            with open(os.path.join(scratch, 'columns.json'), 'w') as f:
+                json.dump({'rows': rows, 'columns': columns}, f)
+            os.chmod(scratch, 0o755)  # mkdtemp creates it owner-only
+            os.rename(scratch, arrays)
+        except Exception:
+            shutil.rmtree(scratch, ignore_errors=True)
+            raise
+
+    with open(os.path.join(arrays, 'columns.json')) as f:
+        layout = json.load(f)
+    target = os.path.join(store_dir, name)
+    os.makedirs(target, exist_ok=True)
+    manifest = dict(name=name, sha256=digest, object=object_name, source=_source_stamp(csv_path), **layout)
+    with atomic_write(os.path.join(target, MANIFEST_NAME)) as f:
+        json.dump(manifest, f, indent=2)
+    return target, created
+
+
+def load_columns(path, mmap=True):
+    """Column name -> array; memory-mapped, so nothing is read until it is used"""
+    directory = data_dir(path)
+    manifest = read_manifest(path)
+    return {
+        column: np.load(_column_file(directory, index), mmap_mode='r' if mmap else None,
+                        allow_pickle=False)
+        for index, (column, _) in enumerate(manifest['columns'])
+    }
+
+
+def load(path, mmap=True):
+    """DataFrame whose columns are views of the memory-mapped arrays (no copy, no parsing)"""
+    return pd.DataFrame(load_columns(path, mmap), copy=False)
+
+
+def iter_chunks(path, chunksize):
+    """Row slices of a dataset, each a view of the mapped columns"""
+    frame = load(path)
+    for start in range(0, len(frame), chunksize):
+        yield frame.iloc[start:start + chunksize]
+
+
+def converted_path(csv_path, store_dir=STORE_DIR):
+    """The dataset converted from csv_path, or None if missing or older than the file"""
+    path = os.path.join(store_dir, dataset_name(csv_path))
+    if not is_dataset(path):
+        return None
+    source = read_manifest(path)['source']
+    stamp = _source_stamp(csv_path)
+    if (source['size'], source['mtime_ns']) != (stamp['size'], stamp['mtime_ns']):
+        return None
+    return path
+
+
+def read_table(path, store_dir=STORE_DIR):
+    """DataFrame for a dataset directory or a CSV, preferring an up-to-date converted copy"""
+    if is_dataset(path):
+        return load(path)
+    converted = converted_path(path, store_dir)
+    return load(converted) if converted else pd.read_csv(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert CSVs into the typed columnar dataset store")
+    parser.add_argument('inputs', nargs='*', default=['Data/train.csv', 'Data/test.csv',
+                                                      'Data/insta_train.csv', 'Data/insta_test.csv'])
+    parser.add_argument('--store', default=STORE_DIR)
+    args = parser.parse_args(argv)
+
+    for csv_path in args.inputs:
+        path, created = convert(csv_path, args.store)
+        manifest = read_manifest(path)
+        if not created:
+            print(f"{csv_path} -> {path} (content already stored, arrays shared)")
+            continue
+        directory = data_dir(path)
+        size = sum(os.path.getsize(_column_file(directory, index))
+                   for index in range(len(manifest['columns'])))
+        print(f"{csv_path} -> {path} ({manifest['rows']:,} rows, {size / 1024:.1f} KB, "
+              f"was {os.path.getsize(csv_path) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# drift_monitor.py
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from features import FEATURE_COLUMNS
+from file_utils import atomic_write
+
+REFERENCE_NAME = 'reference.json'
+# Quantile bins per feature (fewer for features with few distinct values)
+N_BINS = 10
+# Rows per comparison window; counts start over after every report
+DEFAULT_WINDOW = 10000
+# Population stability index above which a feature is reported as drifted
+DEFAULT_PSI_THRESHOLD = 0.2
+# Largest accepted change in the predicted-fake rate, in absolute terms
+DEFAULT_RATE_TOLERANCE = 0.1
+# Share of non-finite values in a feature that counts as a data-quality problem
+DEFAULT_MISSING_TOLERANCE = 0.01
+# Floor for empty bins so PSI stays finite
+_EPSILON = 1e-4
+
+# Monitor fed by observe(); None means monitoring is off
+_monitor = None
+
+
+def reference_path(model_path):
+    """Where the training-time statistics of a model live, like calibration.calibration_path"""
+    if os.path.isdir(model_path):
+        return os.path.join(model_path, REFERENCE_NAME)
+    return os.path.splitext(model_path)[0] + '.' + REFERENCE_NAME
+
+
+def build_reference(X, predictions, n_bins=N_BINS):
+    """Bin edges and bin shares of every feature, plus the predicted-fake rate, for X"""
+    features = {}
+    for column in FEATURE_COLUMNS:
+        values = np.asarray(X[column], dtype=np.float64)
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        features[column] = {
+            'edges': edges.tolist(),
+            'shares': (counts / len(values)).tolist(),
+            'min': float(values.min()),
+            'max': float(values.max()),
+        }
+    return {
+        'rows': len(X),
+        'fake_rate': float(np.mean(np.asarray(predictions) == 1)),
+        'features': features,
+    }
+
+
+def save_reference(reference, path):
+    with atomic_write(path) as f:
+        json.dump(reference, f, indent=2)
+
+
+def load_reference(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def psi(expected, observed):
+    """Population stability index between two arrays of bin shares"""
+    expected = np.maximum(expected, _EPSILON)
+    observed = np.maximum(observed, _EPSILON)
+    return float(np.sum((observed - expected) * np.log(observed / expected)))
+
+
+class DriftMonitor:
+    """Constant-memory histograms of scored traffic, compared with the training reference
+
+    Each feature keeps one counter per reference bin, so memory does not grow
+    with traffic. Every `window` rows the histograms are compared with the
+    reference, report(result) is called and the counters start over.
+    """
+
+    def __init__(self, reference, window=DEFAULT_WINDOW, psi_threshold=DEFAULT_PSI_THRESHOLD,
+                 rate_tolerance=DEFAULT_RATE_TOLERANCE, missing_tolerance=DEFAULT_MISSING_TOLERANCE,
+                 report=None):
+        self.reference = reference
+        self.window = window
+        self.psi_threshold = psi_threshold
+        self.rate_tolerance = rate_tolerance
+        self.missing_tolerance = missing_tolerance
+        self.report = report or print_alerts
+        self.edges = [np.asarray(reference['features'][column]['edges']) for column in FEATURE_COLUMNS]
+        self.expected = [np.asarray(reference['features'][column]['shares']) for column in FEATURE_COLUMNS]
+        self.low = np.array([reference['features'][column]['min'] for column in FEATURE_COLUMNS])
+        self.high = np.array([reference['features'][column]['max'] for column in FEATURE_COLUMNS])
+        self.lock = threading.Lock()
+        self.last_result = None
+        self._reset()
+
+    def _reset(self):
+        self.counts = [np.zeros(len(edges) + 1, dtype=np.int64) for edges in self.edges]
+        self.missing = np.zeros(len(FEATURE_COLUMNS), dtype=np.int64)
+        self.out_of_range = np.zeros(len(FEATURE_COLUMNS), dtype=np.int64)
+        self.rows = 0
+        self.fakes = 0
+
+    def update(self, X, predictions):
+        """Add a scored batch: feature matrix in FEATURE_COLUMNS order and predicted labels"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        finite = np.isfinite(X)
+        missing = len(X) - finite.sum(axis=0)
+        out_of_range = ((X < self.low) | (X > self.high)).sum(axis=0)
+        bins = [np.bincount(np.searchsorted(edges, X[:, i][finite[:, i]], side='right'),
+                            minlength=len(edges) + 1)
+                for i, edges in enumerate(self.edges)]
+        fakes = int(np.count_nonzero(np.asarray(predictions) == 1))
+
+        with self.lock:
+            for counts, added in zip(self.counts, bins):
+                counts += added
+            self.missing += missing
+            self.out_of_range += out_of_range
+            self.rows += len(X)
+            self.fakes += fakes
+            if self.rows < self.window:
+                return None
+            result = self._compare()
+            self._reset()
+        self.report(result)
+        return result
+
+    def _compare(self):
+        """Drift figures for the rows counted so far, with the alerts they raise"""
+        features, alerts = {}, []
+        for column, counts, expected, missing, out_of_range in zip(
+                FEATURE_COLUMNS, self.counts, self.expected, self.missing, self.out_of_range):
+            seen = counts.sum()
+            value = psi(expected, counts / seen) if seen else 0.0
+            features[column] = {
+                'psi': value,
+                'missing_rate': float(missing / self.rows),
+                'out_of_range_rate': float(out_of_range / self.rows),
+            }
+            if value > self.psi_threshold:
+                alerts.append(f"{column}: PSI {value:.3f} > {self.psi_threshold}")
+            if missing / self.rows > self.missing_tolerance:
+                alerts.append(f"{column}: {missing / self.rows:.1%} missing or non-finite values")
+
+        fake_rate = self.fakes / self.rows
+        if abs(fake_rate - self.reference['fake_rate']) > self.rate_tolerance:
+            alerts.append(f"predicted fake rate {fake_rate:.1%} vs {self.reference['fake_rate']:.1%} "
+                          f"at training time")
+        self.last_result = {
+            'time': time.time(),
+            'rows': self.rows,
+            'fake_rate': fake_rate,
+            'reference_fake_rate': self.reference['fake_rate'],
+            'features': features,
+            'alerts': alerts,
+        }
+        return self.last_result
+
+    def flush(self):
+        """Compare and report whatever the current partial window holds"""
+        with self.lock:
+            if not self.rows:
+                return None
+            result = self._compare()
+            self._reset()
+        self.report(result)
+        return result
+
+
+def print_alerts(result, stream=sys.stderr):
+    for alert in result['alerts']:
+        print(f"Drift alert ({result['rows']} rows): {alert}", file=stream)
+
+
+def json_log_report(path):
+    """report callback appending every window's result to path as one JSON line"""
+    lock = threading.Lock()
+
+    def report(result):
+        print_alerts(result)
+        with lock, open(path, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+    return report
+
+
+def set_monitor(monitor):
+    """Feed scored batches to monitor (None turns monitoring off); returns the previous one"""
+    global _monitor
+    previous, _monitor = _monitor, monitor
+    return previous
+
+
+def get_monitor():
+    return _monitor
+
+
+def observe(X, predictions):
+    """Hook on the scoring path: a no-op unless a monitor is set"""
+    monitor = _monitor
+    if monitor is not None:
+        monitor.update(X[FEATURE_COLUMNS] if hasattr(X, 'columns') else X, predictions)
+
+
+def monitor_for(model_path, log_path=None, **options):
+    """DriftMonitor against the reference stored with a model
+
+    Raises ValueError when the reference was computed for another version of
+    the model (online_training.py rewrites the pickle in place).
+    """
+    from score_cache import model_version
+
+    path = reference_path(model_path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found; run 'drift_monitor.py' first")
+    reference = load_reference(path)
+    if reference.get('model_version') not in (None, model_version(model_path)):
+        raise ValueError(f"{path} was computed for another version of the model; "
+                         f"run 'drift_monitor.py' again")
+    report = json_log_report(log_path) if log_path else None
+    return DriftMonitor(reference, report=report, **options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Training-time reference statistics for drift monitoring")
+    parser.add_argument('-m', '--model', default='models/random_forest_model.pkl')
+    parser.add_argument('--model-version', default=None, help="Registered model version")
+    parser.add_argument('--data', nargs='*', default=['Data/train.csv', 'Data/test.csv'],
+                        help="Training data the reference is computed from")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    from dataset_store import read_table
+    from score_cache import model_version
+    from scoring import load_model, resolve_model_path
+
+    model_path = resolve_model_path(args.model, args.model_version)
+    X = pd.concat([read_table(path) for path in args.data], ignore_index=True)[FEATURE_COLUMNS]
+    reference = build_reference(X, load_model(model_path).predict(X))
+    reference['model_version'] = model_version(model_path)
+    save_reference(reference, reference_path(model_path))
+    print(f"Reference from {len(X)} rows (predicted fake rate {reference['fake_rate']:.1%}) "
+          f"saved to {reference_path(model_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# farm_index.py
+import argparse
+import re
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from scoring import (MODEL_PATH, features_from_frame, load_model, read_chunks,
+                     resolve_model_path, score_features)
+
+# MinHash signature length = BANDS * ROWS_PER_BAND; two accounts become candidates
+# when one band matches, which is likely above roughly (1 / BANDS) ** (1 / ROWS_PER_BAND)
+BANDS = 16
+ROWS_PER_BAND = 4
+# Estimated Jaccard similarity a candidate pair needs to join a cluster
+DEFAULT_THRESHOLD = 0.6
+# Width of a grid cell over log2(count + 1) of posts, followers and follows; bands
+# alternate between two grids offset by half a cell, so close neighbours split by
+# a cell boundary in one grid usually share a cell in the other
+GRID_WIDTH = 1.0
+GRID_OFFSETS = (0.0, 0.5)
+GRID_COUNTS = ['#posts', '#followers', '#follows']
+GRID_FLAGS = ['profile pic', 'private', 'external URL']
+
+_DIGITS = re.compile(r'\d+')
+_WORD = re.compile(r'\w+')
+_rng = np.random.RandomState(1)
+# a * x + b wraps modulo 2**32 in uint32; odd a makes each one a permutation of the hashes
+_HASH_A = _rng.randint(0, 1 << 31, size=BANDS * ROWS_PER_BAND).astype(np.uint32) * 2 + 1
+_HASH_B = _rng.randint(0, 1 << 31, size=BANDS * ROWS_PER_BAND).astype(np.uint32)
+
+
+def shingles(username, bio):
+    """Hashed shingles: 3-grams of the username with digit runs collapsed, plus bio words
+
+    Collapsing digits makes "anna.rose_1993" and "anna.rose_20417" look alike,
+    which is how farm accounts are usually named.
+    """
+    name = _DIGITS.sub('0', str(username).lower())
+    grams = {'u:' + name[i:i + 3] for i in range(max(len(name) - 2, 1))}
+    grams.update('b:' + word for word in _WORD.findall(str(bio).lower()))
+    return [zlib.crc32(gram.encode('utf-8')) for gram in grams]
+
+
+def minhash_signatures(usernames, bios, chunk_rows=2000):
+    """(rows, BANDS * ROWS_PER_BAND) MinHash signatures, computed a chunk of rows at a time"""
+    usernames = list(usernames)
+    bios = list(bios)
+    signatures = np.empty((len(usernames), len(_HASH_A)), dtype=np.uint32)
+    for start in range(0, len(usernames), chunk_rows):
+        hashed = [shingles(username, bio) for username, bio in
+                  zip(usernames[start:start + chunk_rows], bios[start:start + chunk_rows])]
+        lengths = np.fromiter((len(h) for h in hashed), dtype=np.int64, count=len(hashed))
+        values = np.fromiter((v for h in hashed for v in h), dtype=np.uint32, count=int(lengths.sum()))
+        permuted = _HASH_A[:, None] * values[None, :] + _HASH_B[:, None]
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        signatures[start:start + len(hashed)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return signatures
+
+
+def grid_cells(X, offset=0.0):
+    """One integer per row naming its cell in the grid over the numeric features"""
+    cells = np.zeros(len(X), dtype=np.uint64)
+    for column in GRID_COUNTS:
+        cell = np.floor(np.log2(X[column].to_numpy(dtype=np.float64) + 1) / GRID_WIDTH + offset)
+        cells = (cells << np.uint64(6)) | np.clip(cell, 0, 63).astype(np.uint64)
+    for column in GRID_FLAGS:
+        cells = (cells << np.uint64(1)) | (X[column].to_numpy() != 0).astype(np.uint64)
+    return cells
+
+
+def cluster_labels(signatures, grids, threshold=DEFAULT_THRESHOLD):
+    """Cluster label per row: near-duplicate text in the same numeric grid cell
+
+    grids holds one grid_cells array per offset; band i buckets by grids[i % len(grids)].
+
+    Rows sharing a band bucket (and a cell) are compared with the first row of
+    that bucket only, so the work grows with the number of rows, not pairs.
+    """
+    n = len(signatures)
+    bands = signatures.reshape(n, BANDS, ROWS_PER_BAND).astype(np.uint64)
+    sources, targets = [], []
+    for band in range(BANDS):
+        key = grids[band % len(grids)]
+        for row in range(ROWS_PER_BAND):
+            key = key * np.uint64(1000003) + bands[:, band, row]
+        _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        leader = first[inverse.ravel()]
+        candidates = np.flatnonzero(leader != np.arange(n))
+        similarity = (signatures[candidates] == signatures[leader[candidates]]).mean(axis=1)
+        keep = candidates[similarity >= threshold]
+        sources.append(keep)
+        targets.append(leader[keep])
+
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+    graph = coo_matrix((np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(n, n))
+    return connected_components(graph, directed=False)[1]
+
+
+def build_index(frame, threshold=DEFAULT_THRESHOLD):
+    """(features, cluster labels) for raw profile rows"""
+    if 'username' not in frame.columns:
+        raise ValueError("Clustering needs raw profiles (username, bio, ...), not feature columns")
+    X = features_from_frame(frame)
+    bios = frame['bio'] if 'bio' in frame.columns else [''] * len(frame)
+    signatures = minhash_signatures(frame['username'], bios)
+    grids = [grid_cells(X, offset) for offset in GRID_OFFSETS]
+    return X, cluster_labels(signatures, grids, threshold)
+
+
+def score_clusters(model, frame, threshold=DEFAULT_THRESHOLD):
+    """Score each distinct feature vector of a cluster once and share its verdict
+
+    Cluster members only reuse a score when all their model features equal the
+    scored row's, so every row gets exactly the verdict it would get on its own;
+    members that differ (e.g. in username digits or bio length) are scored too.
+
+    Returns the scored rows with cluster_id, cluster_size and representative columns.
+    """
+    X, labels = build_index(frame, threshold)
+    _, cluster_ids = np.unique(labels, return_inverse=True)
+    cluster_ids = cluster_ids.ravel()
+    # The first row of each (cluster, feature vector) group is scored for the group
+    keys = np.column_stack([cluster_ids, X.to_numpy(dtype=np.float64)])
+    _, representatives, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    scored = score_features(model, X.iloc[representatives])
+
+    results = scored.iloc[inverse.ravel()].set_index(X.index)
+    results.insert(0, 'cluster_id', cluster_ids)
+    results['cluster_size'] = np.bincount(cluster_ids)[cluster_ids]
+    results['representative'] = np.isin(np.arange(len(X)), representatives)
+    ids = [field for field in ('id', 'username') if field in frame.columns]
+    return pd.concat([frame[ids], results], axis=1) if ids else results
+
+
+def cluster_stats(results, top=10):
+    """Summary of the clusters in score_clusters output"""
+    clusters = results.assign(fake=results['prediction'] == 1).groupby('cluster_id').agg(
+        size=('cluster_size', 'first'),
+        scored=('representative', 'sum'),
+        fake_rate=('fake', 'mean'),
+        fake_probability=('fake_probability', 'mean'),
+    )
+    farms = clusters[clusters['size'] > 1]
+    return {
+        'rows': len(results),
+        'clusters': len(clusters),
+        'scored': int(results['representative'].sum()),
+        'rows_in_multi_clusters': int(farms['size'].sum()),
+        'multi_clusters': len(farms),
+        'multi_cluster_fake_rate': float(np.average(farms['fake_rate'], weights=farms['size']))
+        if len(farms) else 0.0,
+        'largest': farms.sort_values('size', ascending=False).head(top),
+    }
+
+
+def print_stats(stats, stream=sys.stderr):
+    print(f"{stats['rows']:,} rows -> {stats['clusters']:,} clusters "
+          f"({stats['scored']:,} scored, {stats['rows'] - stats['scored']:,} reused)", file=stream)
+    print(f"{stats['multi_clusters']:,} clusters of 2+ accounts hold {stats['rows_in_multi_clusters']:,} "
+          f"rows; {stats['multi_cluster_fake_rate']:.1%} of them are predicted fake", file=stream)
+    if len(stats['largest']):
+        print("Largest clusters:", file=stream)
+        print(stats['largest'].to_string(), file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Group near-duplicate accounts and share verdicts between identical members")
+    parser.add_argument('input', help="CSV or JSONL of raw profiles")
+    parser.add_argument('-o', '--output', default='-', help="Output CSV (default: stdout)")
+    parser.add_argument('-m', '--model', default=MODEL_PATH)
+    parser.add_argument('--model-version', default=None, help="Registered model version to use")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Estimated Jaccard similarity needed to join a cluster")
+    parser.add_argument('--top', type=int, default=10, help="Largest clusters to list")
+    args = parser.parse_args(argv)
+
+    model = load_model(resolve_model_path(args.model, args.model_version))
+    frame = pd.concat(read_chunks(args.input), ignore_index=True)
+    results = score_clusters(model, frame, args.threshold)
+    results.to_csv(sys.stdout if args.output == '-' else args.output, index=False)
+    print_stats(cluster_stats(results, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# features.py
+import re
+
+import numpy as np
+import pandas as pd
+
+# Column order the model was trained with (see Data/train.csv)
+FEATURE_COLUMNS = [
+    'profile pic',
+    'nums/length username',
+    'fullname words',
+    'nums/length fullname',
+    'name==username',
+    'description length',
+    'external URL',
+    'private',
+    '#posts',
+    '#followers',
+    '#follows',
+]
+
+# Raw profile fields accepted by the batch and service paths
+PROFILE_FIELDS = [
+    'username',
+    'fullname',
+    'bio',
+    'has_pic',
+    'is_private',
+    'posts',
+    'followers',
+    'following',
+]
+
+URL_PATTERN = re.compile(r'http[s]?://')
+# Strings accepted as "yes" in raw flag columns
+TRUE_STRINGS = ('1', 'true', 'yes', 'y', 'private')
+
+
+def calculate_numeric_ratio(text):
+    """Calculate ratio of numeric characters in a string"""
+    if not text:
+        return 0.0
+
+    numeric_chars = sum(1 for char in text if char.isdigit())
+    return round(numeric_chars / len(text), 4)
+
+
+_ALL_FIELDS = frozenset(PROFILE_FIELDS)
+
+
+def extract_features(username, fullname, bio, has_pic, is_private, posts, followers, following):
+    """Extract all required features from user inputs"""
+    features = dict.fromkeys(FEATURE_COLUMNS, 0)
+    return update_features(
+        features, _ALL_FIELDS,
+        username, fullname, bio, has_pic, is_private, posts, followers, following
+    )
+
+
+def update_features(features, fields, username, fullname, bio, has_pic, is_private, posts, followers, following):
+    """Recompute, in place, only the features that depend on the changed raw fields"""
+    fields = frozenset(fields)
+
+    # Profile picture
+    if 'has_pic' in fields:
+        features['profile pic'] = 1 if has_pic else 0
+
+    # Username features
+    if 'username' in fields:
+        features['nums/length username'] = calculate_numeric_ratio(username)
+
+    # Fullname features
+    if 'fullname' in fields:
+        name_parts = fullname.split()
+        features['fullname words'] = len(name_parts)
+        features['nums/length fullname'] = calculate_numeric_ratio(fullname)
+    if 'username' in fields or 'fullname' in fields:
+        features['name==username'] = 1 if username.lower() == fullname.lower().replace(" ", "") else 0
+
+    # Bio features
+    if 'bio' in fields:
+        features['description length'] = len(bio)
+        features['external URL'] = 1 if URL_PATTERN.search(bio) else 0
+
+    # Account settings
+    if 'is_private' in fields:
+        features['private'] = 1 if is_private == "Private" else 0
+
+    # Activity metrics
+    if 'posts' in fields:
+        features['#posts'] = int(posts) if posts else 0
+    if 'followers' in fields:
+        features['#followers'] = int(followers) if followers else 0
+    if 'following' in fields:
+        features['#follows'] = int(following) if following else 0
+
+    return features
+
+
+def _is_missing(value):
+    """Check for empty cells coming from CSV/JSON readers"""
+    return value is None or value != value or value == ''
+
+
+def _as_text(value):
+    """Turn a raw text cell into a stripped string"""
+    return '' if _is_missing(value) else str(value).strip()
+
+
+def _as_flag(value, default=False):
+    """Interpret a yes/no cell from a raw profile file; blanks take the field's default"""
+    if _is_missing(value):
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_STRINGS
+    return bool(value)
+
+
+def _as_count(value):
+    """Interpret a count cell, treating blanks as zero"""
+    if _is_missing(value):
+        return 0
+    if isinstance(value, str):
+        value = value.strip().replace(',', '')
+        if not value:
+            return 0
+    return int(float(value))
+
+
+def normalize_profile(record):
+    """Map a raw profile record onto the arguments of extract_features"""
+    return (
+        _as_text(record.get('username')),
+        _as_text(record.get('fullname')),
+        _as_text(record.get('bio')),
+        _as_flag(record.get('has_pic'), default=True),
+        "Private" if _as_flag(record.get('is_private')) else "Public",
+        _as_count(record.get('posts')),
+        _as_count(record.get('followers')),
+        _as_count(record.get('following')),
+    )
+
+
+def _as_series(values, index=None):
+    """Wrap an array-like as an object Series so string ops use Python semantics"""
+    if isinstance(values, pd.Series):
+        return values.astype(object)
+    return pd.Series(values, index=index, dtype=object)
+
+
+def numeric_ratio_column(texts):
+    """Vectorized calculate_numeric_ratio over a Series of strings"""
+    if len(texts) == 0:
+        return np.zeros(0)
+
+    lengths = texts.str.len().to_numpy(dtype=np.int64)
+    counts = texts.str.count(r'[0-9]').to_numpy(dtype=np.int64, copy=True)
+
+    # Non-ASCII digits (e.g. '²') only count through str.isdigit
+    non_ascii = texts.str.contains(r'[^\x00-\x7f]').to_numpy(dtype=bool)
+    if non_ascii.any():
+        counts[non_ascii] = [
+            sum(1 for char in text if char.isdigit())
+            for text in texts[non_ascii]
+        ]
+
+    ratios = np.divide(counts, lengths, out=np.zeros(len(texts)), where=lengths > 0)
+
+    # Python round() on the few distinct ratios keeps values identical to the per-row path
+    unique, inverse = np.unique(ratios, return_inverse=True)
+    rounded = np.array([round(float(value), 4) for value in unique])
+    return rounded[inverse.reshape(-1)]
+
+
+def _count_column(values):
+    """Turn a column of counts into int64, treating blanks as zero"""
+    values = values.fillna(0)
+    values = values.mask(values == '', 0)
+    return pd.to_numeric(values).to_numpy(dtype=np.float64).astype(np.int64)
+
+
+def extract_features_columns(usernames, fullnames, bios, has_pic, is_private, posts, followers, following):
+    """Extract the model features from columns of raw profile inputs"""
+    usernames = _as_series(usernames)
+    index = usernames.index
+    fullnames = _as_series(fullnames, index)
+    bios = _as_series(bios, index)
+
+    features = pd.DataFrame(index=index)
+
+    # Profile picture
+    features['profile pic'] = _as_series(has_pic, index).astype(bool).astype(np.int64).to_numpy()
+
+    # Username features
+    features['nums/length username'] = numeric_ratio_column(usernames)
+
+    # Fullname features
+    features['fullname words'] = fullnames.str.count(r'\S+').to_numpy(dtype=np.int64)
+    features['nums/length fullname'] = numeric_ratio_column(fullnames)
+    squashed = fullnames.str.lower().str.replace(" ", "", regex=False)
+    features['name==username'] = (usernames.str.lower() == squashed).to_numpy(dtype=np.int64)
+
+    # Bio features
+    features['description length'] = bios.str.len().to_numpy(dtype=np.int64)
+    features['external URL'] = bios.str.contains(URL_PATTERN).to_numpy(dtype=np.int64)
+
+    # Account settings
+    features['private'] = (_as_series(is_private, index) == "Private").to_numpy(dtype=np.int64)
+
+    # Activity metrics
+    features['#posts'] = _count_column(_as_series(posts, index))
+    features['#followers'] = _count_column(_as_series(followers, index))
+    features['#follows'] = _count_column(_as_series(following, index))
+
+    return features
+
+
+def _text_column(frame, field):
+    """Vectorized _as_text for one raw column"""
+    if field not in frame.columns:
+        return pd.Series('', index=frame.index, dtype=object)
+    return frame[field].astype(object).fillna('').astype(str).str.strip()
+
+
+def _flag_column(frame, field, default=False):
+    """Vectorized _as_flag for one raw column"""
+    if field not in frame.columns:
+        return np.full(len(frame), default)
+    values = frame[field]
+    # Records without the key come through as NaN, and take the default like normalize_profile
+    if pd.api.types.is_numeric_dtype(values):
+        return values.fillna(default).astype(bool).to_numpy()
+    # Strings mixed with JSON booleans need the per-cell rules
+    return values.astype(object).map(lambda value: _as_flag(value, default)).to_numpy(dtype=bool)
+
+
+def _raw_count_column(frame, field):
+    """Vectorized _as_count for one raw column"""
+    if field not in frame.columns:
+        return np.zeros(len(frame), dtype=np.int64)
+    values = frame[field]
+    if not pd.api.types.is_numeric_dtype(values):
+        values = values.astype(object).fillna('').astype(str).str.strip().str.replace(',', '', regex=False)
+        values = values.mask(values == '', '0')
+    return pd.to_numeric(values).fillna(0).to_numpy(dtype=np.float64).astype(np.int64)
+
+
+def extract_features_frame(frame):
+    """Extract the model features from a DataFrame of raw profile fields"""
+    is_private = np.where(_flag_column(frame, 'is_private'), "Private", "Public")
+    return extract_features_columns(
+        _text_column(frame, 'username'),
+        _text_column(frame, 'fullname'),
+        _text_column(frame, 'bio'),
+        _flag_column(frame, 'has_pic', default=True),
+        is_private,
+        _raw_count_column(frame, 'posts'),
+        _raw_count_column(frame, 'followers'),
+        _raw_count_column(frame, 'following'),
+    )
@@ -0,0 +1,17 @@
+# file_utils.py
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path, mode='w'):
+    """Write to path.tmp and rename it over path on success, so readers never see half a file"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
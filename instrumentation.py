@@ -0,0 +1,211 @@
+# instrumentation.py
+import bisect
+import functools
+import json
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Where stage timings go; None means instrumentation is off
+_sink = None
+
+
+def set_sink(sink):
+    """Send stage timings to sink (None turns them off); returns the previous sink"""
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+def get_sink():
+    return _sink
+
+
+class _NullTimer:
+    """Shared do-nothing context manager used while instrumentation is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('sink', 'name', 'start')
+
+    def __init__(self, sink, name):
+        self.sink = sink
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.sink.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def stage(name):
+    """Context manager timing one stage of the scoring path"""
+    sink = _sink
+    if sink is None:
+        return _NULL_TIMER
+    return _Timer(sink, name)
+
+
+def timed(name):
+    """Decorator form of stage()"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            sink = _sink
+            if sink is None:
+                return func(*args, **kwargs)
+            with _Timer(sink, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class HistogramSink:
+    """In-memory latency histograms per stage, exportable as Prometheus text"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.sums = {}
+
+    def record(self, name, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            counts = self.counts.get(name)
+            if counts is None:
+                counts = self.counts[name] = [0] * (len(self.buckets) + 1)
+                self.sums[name] = 0.0
+            counts[index] += 1
+            self.sums[name] += seconds
+
+    def _quantile(self, counts, q):
+        """Upper bound of the bucket holding the q-th quantile"""
+        target = q * sum(counts)
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+    def snapshot(self):
+        """Per-stage count, mean and bucketed p50/p99, in milliseconds"""
+        with self.lock:
+            counts = {name: list(values) for name, values in self.counts.items()}
+            sums = dict(self.sums)
+        return {
+            name: {
+                'count': sum(values),
+                'mean_ms': sums[name] / sum(values) * 1000,
+                'p50_ms': self._quantile(values, 0.5) * 1000,
+                'p99_ms': self._quantile(values, 0.99) * 1000,
+            }
+            for name, values in counts.items()
+        }
+
+    def to_prometheus(self, metric='scoring_stage_seconds'):
+        """Prometheus text exposition format"""
+        with self.lock:
+            counts = {name: list(values) for name, values in self.counts.items()}
+            sums = dict(self.sums)
+
+        lines = [f"# HELP {metric} Time spent in each scoring stage.", f"# TYPE {metric} histogram"]
+        for name in sorted(counts):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts[name]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{metric}_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {sums[name]}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+class JsonLogSink:
+    """Append one JSON line per timing to a file (or stream)"""
+
+    def __init__(self, path_or_stream):
+        if isinstance(path_or_stream, str):
+            self.stream = open(path_or_stream, 'a', buffering=1)
+            self.owned = True
+        else:
+            self.stream = path_or_stream
+            self.owned = False
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds):
+        line = json.dumps({'time': time.time(), 'stage': name, 'ms': seconds * 1000})
+        with self.lock:
+            self.stream.write(line + '\n')
+
+    def close(self):
+        if self.owned:
+            self.stream.close()
+
+
+class MultiSink:
+    """Fan timings out to several sinks"""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def record(self, name, seconds):
+        for sink in self.sinks:
+            sink.record(name, seconds)
+
+
+def measure_latency(model, X, repeats=50):
+    """Median single-row and per-row batch predict_proba latency in milliseconds"""
+    row = X.iloc[:1]
+    model.predict_proba(row)  # warm-up
+    single = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        single.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    model.predict_proba(X)
+    batch = (time.perf_counter() - start) * 1000 / len(X)
+    return statistics.median(single), batch
+
+
+@contextmanager
+def profile(path=None, limit=25):
+    """cProfile everything run inside the block
+
+    Stats are dumped to path (open with pstats or snakeviz), or the top `limit`
+    functions by cumulative time are printed to stderr.
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+        else:
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(limit)
@@ -0,0 +1,150 @@
+# model_compaction.py
+import argparse
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.tree import DecisionTreeClassifier
+
+from calibration import training_split
+from compiled_forest import CompiledForest
+from instrumentation import measure_latency
+from scoring import MODEL_PATH
+
+OUTPUT_DIR = 'models/compact'
+
+
+def save_variant(model, output_dir, name):
+    """Save a variant in its native format and return the file path"""
+    if isinstance(model, CompiledForest):
+        path = os.path.join(output_dir, f"{name}.npz")
+        model.save(path)
+    else:
+        path = os.path.join(output_dir, f"{name}.pkl")
+        joblib.dump(model, path)
+    return path
+
+
+def augment(X, copies, seed):
+    """Jittered copies of X, so a student sees more of the teacher's decision surface"""
+    rng = np.random.default_rng(seed)
+    samples = [X]
+    for _ in range(copies):
+        jittered = X.copy()
+        for column in X.columns:
+            # Binary flags stay as they are; counts, lengths and ratios get multiplicative noise
+            if X[column].nunique() <= 2:
+                continue
+            noisy = X[column] * np.exp(rng.normal(0, 0.2, len(X)))
+            if pd.api.types.is_integer_dtype(X[column]):
+                noisy = noisy.round().astype(X[column].dtype)
+            jittered[column] = noisy
+        samples.append(jittered)
+    return pd.concat(samples, ignore_index=True)
+
+
+def distill(teacher, X, student, copies=5, seed=42):
+    """Fit student on the teacher's labels over augmented training rows"""
+    X_augmented = augment(X, copies, seed)
+    student.fit(X_augmented, teacher.predict(X_augmented))
+    return student
+
+
+def build_variants(model, X_train, trees, depths, distill_depths, seed):
+    """Yield (name, model) for every requested compact variant"""
+    compiled = CompiledForest.from_model(model)
+    yield 'compiled', compiled
+
+    for n_trees in trees:
+        yield f"trees_{n_trees}", compiled.prune(n_trees=n_trees)
+    for depth in depths:
+        yield f"depth_{depth}", compiled.prune(max_depth=depth)
+    for n_trees in trees:
+        for depth in depths:
+            yield f"trees_{n_trees}_depth_{depth}", compiled.prune(max_depth=depth, n_trees=n_trees)
+
+    for depth in distill_depths:
+        student = DecisionTreeClassifier(max_depth=depth, random_state=seed)
+        yield f"distilled_tree_{depth}", distill(model, X_train, student, seed=seed)
+    student = GradientBoostingClassifier(n_estimators=50, max_depth=3, random_state=seed)
+    yield 'distilled_gbm_50x3', distill(model, X_train, student, seed=seed)
+
+
+def compact(model_path, data_paths, output_dir, trees, depths, distill_depths, test_size=0.2, seed=42):
+    """Build compact variants and report accuracy delta, latency and size for each
+
+    Accuracy is measured on the rows model_training.py held out, and students
+    are distilled on the rest, so no variant is scored on rows it learned from.
+    """
+    model = joblib.load(model_path)
+    X_train, X_test, _, y_test = training_split(data_paths, test_size, seed)
+
+    os.makedirs(output_dir, exist_ok=True)
+    baseline_accuracy = accuracy_score(y_test, model.predict(X_test))
+    single_ms, batch_ms = measure_latency(model, X_test)
+    report = [{
+        'name': 'original',
+        'path': model_path,
+        'size_bytes': os.path.getsize(model_path),
+        'accuracy': baseline_accuracy,
+        'accuracy_delta': 0.0,
+        'single_row_ms': single_ms,
+        'batch_ms_per_row': batch_ms,
+    }]
+
+    for name, variant in build_variants(model, X_train, trees, depths, distill_depths, seed):
+        path = save_variant(variant, output_dir, name)
+        accuracy = accuracy_score(y_test, variant.predict(X_test))
+        single_ms, batch_ms = measure_latency(variant, X_test)
+        report.append({
+            'name': name,
+            'path': path,
+            'size_bytes': os.path.getsize(path),
+            'accuracy': accuracy,
+            'accuracy_delta': accuracy - baseline_accuracy,
+            'single_row_ms': single_ms,
+            'batch_ms_per_row': batch_ms,
+        })
+
+    with open(os.path.join(output_dir, 'compaction_report.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def print_report(report):
+    print(f"{'variant':<24} {'accuracy':>9} {'delta':>8} {'1-row ms':>9} {'us/row':>8} {'size KB':>9}")
+    for entry in report:
+        print(f"{entry['name']:<24} {entry['accuracy']:>9.4f} {entry['accuracy_delta']:>+8.4f} "
+              f"{entry['single_row_ms']:>9.3f} {entry['batch_ms_per_row'] * 1000:>8.2f} "
+              f"{entry['size_bytes'] / 1024:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build smaller, faster variants of the forest")
+    parser.add_argument('-m', '--model', default=MODEL_PATH)
+    parser.add_argument('--data', nargs='*', default=['Data/train.csv', 'Data/test.csv'],
+                        help="Training data, split like model_training.py: students are distilled "
+                             "on the training part, accuracy is measured on the holdout")
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('-o', '--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--trees', type=int, nargs='*', default=[10, 25, 50],
+                        help="Keep only the first N trees")
+    parser.add_argument('--depths', type=int, nargs='*', default=[4, 6, 8],
+                        help="Cut every tree off at this depth")
+    parser.add_argument('--distill-depths', type=int, nargs='*', default=[4, 6, 8],
+                        help="Depths of single-tree students")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    report = compact(args.model, args.data, args.output_dir, args.trees, args.depths,
+                     args.distill_depths, args.test_size, args.seed)
+    print_report(report)
+    print(f"\nVariants and compaction_report.json written to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
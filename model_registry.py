@@ -0,0 +1,204 @@
+# model_registry.py
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from calibration import calibration_path, holdout
+from drift_monitor import reference_path, save_reference
+from compiled_forest import CompiledForest
+from features import FEATURE_COLUMNS
+
+REGISTRY_DIR = 'models/registry'
+MANIFEST_NAME = 'manifest.json'
+ARTIFACT_FORMAT = 'compiled_forest/1'
+
+
+def _version_number(version):
+    return int(version[1:]) if version[:1] == 'v' and version[1:].isdigit() else -1
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    """Registered versions, oldest first"""
+    if not os.path.isdir(registry_dir):
+        return []
+    versions = [
+        name for name in os.listdir(registry_dir)
+        if is_version_dir(os.path.join(registry_dir, name))
+    ]
+    return sorted(versions, key=lambda name: (_version_number(name), name))
+
+
+def resolve_version(version='latest', registry_dir=REGISTRY_DIR):
+    """Turn 'latest' into a concrete version name"""
+    if version != 'latest':
+        return version
+    versions = list_versions(registry_dir)
+    if not versions:
+        raise FileNotFoundError(f"No models registered in {registry_dir}")
+    return versions[-1]
+
+
+def version_dir(version='latest', registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, resolve_version(version, registry_dir))
+
+
+def read_manifest(version='latest', registry_dir=REGISTRY_DIR):
+    with open(os.path.join(version_dir(version, registry_dir), MANIFEST_NAME)) as f:
+        return json.load(f)
+
+
+def hash_files(paths):
+    """SHA-256 over the given files, in order, read in blocks
+
+    A dataset store directory counts as the file it was converted from.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.isdir(path):
+            from dataset_store import read_manifest
+
+            # Converted datasets record the hash of the file they came from
+            digest.update(read_manifest(path)['sha256'].encode('ascii'))
+            continue
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def register(model, version=None, data_paths=(), metrics=None, source=None, registry_dir=REGISTRY_DIR,
+             calibration=None, reference=None):
+    """Store a forest as memory-mappable arrays plus a manifest; returns the version name"""
+    compiled = model if isinstance(model, CompiledForest) else CompiledForest.from_model(model)
+    if list(compiled.feature_names_in_) != FEATURE_COLUMNS:
+        raise ValueError("Model feature order does not match FEATURE_COLUMNS")
+
+    os.makedirs(registry_dir, exist_ok=True)
+    if version is None:
+        numbers = [_version_number(name) for name in list_versions(registry_dir)]
+        version = f"v{max(numbers + [0]) + 1}"
+    target = os.path.join(registry_dir, version)
+    if os.path.exists(target):
+        raise FileExistsError(f"Model version {version} is already registered")
+
+    manifest = {
+        'version': version,
+        'format': ARTIFACT_FORMAT,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'source': source,
+        'feature_names': list(compiled.feature_names_in_),
+        'classes': [int(label) for label in compiled.classes_],
+        'n_estimators': compiled.n_estimators,
+        'n_nodes': len(compiled.feature),
+        'max_depth': compiled.max_depth,
+        'training_data': {
+            'paths': list(data_paths),
+            'sha256': hash_files(data_paths) if data_paths else None,
+        },
+        'metrics': metrics or {},
+        'calibration': calibration.method if calibration is not None else None,
+    }
+
+    # Build in a scratch directory and rename, so readers never see a half-written version
+    scratch = tempfile.mkdtemp(prefix=f".{version}-", dir=registry_dir)
+    try:
+        compiled.save_arrays(scratch)
+        with open(os.path.join(scratch, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        from score_cache import model_version
+
+        # Calibration and reference now belong to the registered arrays, not to the file they came from
+        if calibration is not None:
+            calibration.model_version = model_version(scratch)
+            calibration.save(calibration_path(scratch))
+        if reference is not None:
+            save_reference(dict(reference, model_version=model_version(scratch)), reference_path(scratch))
+        os.chmod(scratch, 0o755)  # mkdtemp creates it owner-only
+        os.rename(scratch, target)
+    except Exception:
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+    return version
+
+
+def is_version_dir(path):
+    return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+
+def load_dir(directory, mmap=True, warm=False):
+    """Load one version directory after checking its manifest
+
+    warm=True also builds the lookup tables (10-15 ms) instead of leaving
+    that to the first predict; servers do this before taking traffic.
+    """
+    with open(os.path.join(directory, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"Unsupported model format: {manifest.get('format')}")
+    if manifest['feature_names'] != FEATURE_COLUMNS:
+        raise ValueError(f"Model {manifest['version']} expects a different feature order")
+    model = CompiledForest.load_arrays(directory, mmap_mode='r' if mmap else None)
+    return model.warm() if warm else model
+
+
+def load(version='latest', registry_dir=REGISTRY_DIR, mmap=True, warm=False):
+    """Load a registered forest; arrays are memory-mapped unless mmap=False"""
+    return load_dir(version_dir(version, registry_dir), mmap, warm)
+
+
+def evaluate(model, data_paths):
+    """Accuracy on the rows model_training.py holds out of data_paths"""
+    X, y = holdout(data_paths)
+    return float((model.predict(X) == y).mean())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Versioned registry of compiled models")
+    parser.add_argument('--registry', default=REGISTRY_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('register', help="Register a pickled model or .npz forest")
+    add.add_argument('model', nargs='?', default='models/random_forest_model.pkl')
+    add.add_argument('--version', help="Version name (default: next vN)")
+    add.add_argument('--data', nargs='*', default=['Data/train.csv', 'Data/test.csv'],
+                     help="Training data files to hash into the manifest")
+    add.add_argument('--evaluate', nargs='*', default=['Data/train.csv', 'Data/test.csv'],
+                     help="Training data whose holdout accuracy goes in the manifest "
+                          "(no files to skip)")
+
+    commands.add_parser('list', help="List registered versions")
+    show = commands.add_parser('show', help="Print a version's manifest")
+    show.add_argument('version', nargs='?', default='latest')
+    args = parser.parse_args(argv)
+
+    if args.command == 'register':
+        from calibration import load_for
+        from drift_monitor import load_reference
+        from score_cache import model_version
+        from scoring import load_model
+
+        model = load_model(args.model)
+        metrics = {'accuracy': evaluate(model, args.evaluate)} if args.evaluate else {}
+        reference_file = reference_path(args.model)
+        reference = load_reference(reference_file) if os.path.exists(reference_file) else None
+        if reference is not None and reference.get('model_version') not in (None, model_version(args.model)):
+            print(f"Not registering {reference_file}: it belongs to another version of the model")
+            reference = None
+        version = register(model, args.version, args.data, metrics, args.model, args.registry,
+                           load_for(args.model), reference)
+        print(f"Registered {args.model} as {version}")
+    elif args.command == 'list':
+        for version in list_versions(args.registry):
+            manifest = read_manifest(version, args.registry)
+            print(f"{version}\t{manifest['created']}\t{manifest['n_estimators']} trees\t"
+                  f"{manifest['metrics']}")
+    else:
+        print(json.dumps(read_manifest(args.version, args.registry), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# model_reload.py
+import os
+import sys
+import threading
+
+from scoring import load_model, resolve_model_path
+
+
+def model_fingerprint(path):
+    """Changes whenever the file, or a registry version's manifest, is replaced"""
+    if os.path.isdir(path):
+        path = os.path.join(path, 'manifest.json')
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class ModelWatcher:
+    """Reload the model when its file changes, or when a newer registry version appears
+
+    on_reload(model, path) is called from the watcher thread with the freshly
+    loaded model; swapping it in is a single attribute assignment on the caller's
+    side, so requests see either the old model or the new one, never a mix.
+    """
+
+    def __init__(self, path, version=None, on_reload=None, interval=5.0):
+        self.path = path
+        self.version = version
+        self.on_reload = on_reload
+        self.interval = interval
+        self.current = self._resolve()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _resolve(self):
+        path = resolve_model_path(self.path, self.version)
+        return path, model_fingerprint(path)
+
+    def check(self):
+        """Reload if the model changed since the last check; returns whether it did"""
+        current = self._resolve()
+        if current == self.current:
+            return False
+        model = load_model(current[0])
+        # Build a compiled forest's lookup tables here, not in the requests after the swap
+        if hasattr(model, 'warm'):
+            model.warm()
+        self.current = current
+        if self.on_reload:
+            self.on_reload(model, current[0])
+        return True
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # A half-finished export or a bad file: keep serving the old model and retry
+                print(f"Model reload failed: {e}", file=sys.stderr)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
@@ -6,16 +6,22 @@ from sklearn.metrics import accuracy_score, classification_report
 import joblib
 import os
 
+from calibration import calibration_path, fit as fit_calibration
+from dataset_store import read_table
+from drift_monitor import build_reference, reference_path, save_reference
+from features import FEATURE_COLUMNS
+from score_cache import model_version
+
 def train_model():
-    # Load data
-    train_df = pd.read_csv('data/train.csv')
-    test_df = pd.read_csv('data/test.csv')
+    # Load data (from the typed dataset store when dataset_store.py has converted it)
+    train_df = read_table('Data/train.csv')
+    test_df = read_table('Data/test.csv')
     
     # Combine train and test data for better training
     df = pd.concat([train_df, test_df], axis=0)
     
     # Separate features and target
-    X = df.drop('fake', axis=1)
+    X = df[FEATURE_COLUMNS]
     y = df['fake']
     
     # Split data
@@ -43,5 +49,17 @@ def train_model():
     joblib.dump(model, 'models/random_forest_model.pkl')
     print("Model saved successfully!")
 
+    # Calibrate on the held-out split and store it next to the model
+    calibration = fit_calibration(model, X_test, y_test)
+    calibration.model_version = model_version('models/random_forest_model.pkl')
+    calibration.save(calibration_path('models/random_forest_model.pkl'))
+    print("Calibration saved successfully!")
+
+    # Training-time feature distributions, for drift_monitor.py to compare traffic against
+    reference = build_reference(X, model.predict(X))
+    reference['model_version'] = model_version('models/random_forest_model.pkl')
+    save_reference(reference, reference_path('models/random_forest_model.pkl'))
+    print("Drift reference saved successfully!")
+
 if __name__ == "__main__":
     train_model()
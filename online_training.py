@@ -0,0 +1,141 @@
+# online_training.py
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from features import FEATURE_COLUMNS
+from file_utils import atomic_write
+from scoring import MODEL_PATH, features_from_frame, read_chunks
+from streaming import iter_record_chunks, read_checkpoint, write_checkpoint
+
+FEEDBACK_PATH = 'Data/feedback.csv'
+# What the base model was fitted on (model_training.py)
+DATA_PATHS = ['Data/train.csv', 'Data/test.csv']
+STATE_PATH = 'models/online_state.json'
+TARGET = 'fake'
+# Trees added to the forest per update
+TREES_PER_UPDATE = 10
+# Fewer new labels than this are left for the next update
+MIN_NEW_ROWS = 20
+
+
+def add_feedback(frame, path=FEEDBACK_PATH):
+    """Append labelled accounts (raw profile fields or feature columns, plus 'fake') to the store"""
+    if TARGET not in frame.columns:
+        raise ValueError(f"Feedback rows need a '{TARGET}' label column")
+
+    rows = features_from_frame(frame).copy()
+    rows[TARGET] = frame[TARGET].astype(int).to_numpy()
+    header = not os.path.exists(path) or os.path.getsize(path) == 0
+    rows.to_csv(path, mode='a', header=header, index=False)
+    return len(rows)
+
+
+def read_new_feedback(path, offset=0):
+    """Rows appended to the store since byte offset; returns (X, y, new offset)"""
+    chunks = []
+    for chunk, offset in iter_record_chunks(path, start_offset=offset):
+        chunks.append(chunk)
+    if not chunks:
+        return None, None, offset
+    rows = pd.concat(chunks, ignore_index=True)
+    return rows[FEATURE_COLUMNS], rows[TARGET].astype(int), offset
+
+
+def grow_forest(model, X, y, n_trees=TREES_PER_UPDATE, max_trees=None):
+    """Fit n_trees new trees on (X, y) alongside the existing ones
+
+    Only the new rows are seen, so the cost tracks the size of the update rather
+    than the whole history. With max_trees the oldest trees are dropped first.
+    """
+    if len(np.unique(y)) < len(model.classes_):
+        raise ValueError("New feedback must include both fake and genuine accounts")
+
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_trees)
+    model.fit(X, y)
+    if max_trees and len(model.estimators_) > max_trees:
+        model.estimators_ = model.estimators_[-max_trees:]
+        model.set_params(n_estimators=max_trees)
+    return model
+
+
+def save_model(model, path):
+    """Write the pickle next to path and rename it into place, so scorers never read half a file"""
+    with atomic_write(path, 'wb') as f:
+        joblib.dump(model, f)
+
+
+def update(model_path=MODEL_PATH, feedback_path=FEEDBACK_PATH, state_path=STATE_PATH,
+           n_trees=TREES_PER_UPDATE, max_trees=None, min_rows=MIN_NEW_ROWS, register=False,
+           data_paths=DATA_PATHS):
+    """Grow the model with feedback added since the last update; returns the new row count
+
+    Accuracy is measured on model_training.py's holdout of data_paths: the base
+    trees never saw those rows and the added ones only see feedback.
+    """
+    state = read_checkpoint(state_path) or {}
+    if state.get('feedback') != os.path.abspath(feedback_path):
+        state = {'feedback': os.path.abspath(feedback_path), 'offset': 0, 'rows': 0, 'updates': 0}
+    if not os.path.exists(feedback_path):
+        print(f"No feedback at {feedback_path}")
+        return 0
+
+    X, y, offset = read_new_feedback(feedback_path, state['offset'])
+    new_rows = 0 if X is None else len(X)
+    if new_rows < min_rows:
+        print(f"{new_rows} new labelled accounts; waiting for at least {min_rows}")
+        return 0
+
+    from calibration import holdout
+
+    model = grow_forest(joblib.load(model_path), X, y, n_trees, max_trees)
+    X_test, y_test = holdout(data_paths)
+    accuracy = float((model.predict(X_test) == y_test).mean())
+    save_model(model, model_path)
+
+    state.update(offset=offset, rows=state['rows'] + new_rows, updates=state['updates'] + 1)
+    write_checkpoint(state_path, state)
+    print(f"Added {n_trees} trees on {new_rows} new rows ({len(model.estimators_)} trees, "
+          f"holdout accuracy {accuracy:.4f}); saved to {model_path}")
+
+    if register:
+        from model_registry import register as register_version
+
+        version = register_version(model, data_paths=list(data_paths) + [feedback_path], source=model_path,
+                                   metrics={'feedback_rows': state['rows'], 'accuracy': accuracy})
+        print(f"Registered as {version}")
+    return new_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grow the forest from moderator-labelled accounts")
+    parser.add_argument('--feedback', default=FEEDBACK_PATH, help="Labelled feedback store (CSV)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="Append labelled accounts to the feedback store")
+    add.add_argument('input', help="CSV or JSONL with a 'fake' column")
+
+    grow = commands.add_parser('update', help="Add trees fitted on feedback since the last update")
+    grow.add_argument('-m', '--model', default=MODEL_PATH, help="Pickled forest, replaced atomically")
+    grow.add_argument('--state', default=STATE_PATH, help="Records how much feedback has been used")
+    grow.add_argument('--trees', type=int, default=TREES_PER_UPDATE)
+    grow.add_argument('--max-trees', type=int, default=None, help="Drop the oldest trees beyond this")
+    grow.add_argument('--min-rows', type=int, default=MIN_NEW_ROWS)
+    grow.add_argument('--register', action='store_true', help="Also register the result as a new version")
+    grow.add_argument('--data', nargs='*', default=DATA_PATHS,
+                      help="Data the base model was trained on (holdout and registered training data)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'add':
+        total = sum(add_feedback(chunk, args.feedback) for chunk in read_chunks(args.input))
+        print(f"Added {total} labelled accounts to {args.feedback}")
+    else:
+        update(args.model, args.feedback, args.state, args.trees, args.max_trees, args.min_rows,
+               args.register, args.data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# parallel_scoring.py
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from calibration import load_for
+from compiled_forest import CompiledForest
+from dataset_store import is_dataset, load, read_manifest
+from scoring import MODEL_PATH, load_model, resolve_model_path, score_frame
+from streaming import commit_chunk, iter_raw_chunks, open_output, parse_records, print_progress
+
+DEFAULT_CHUNKSIZE = 20000
+
+# Set in each worker process by _init_worker
+_worker_model = None
+_worker_calibration = None
+_worker_reasons = 0
+# Memory-mapped datasets opened by this worker, by path
+_worker_datasets = {}
+
+
+def _init_worker(model_dir, calibration=None, reasons=0):
+    """Load the memory-mapped forest once per worker process"""
+    global _worker_model, _worker_calibration, _worker_reasons
+    _worker_model = CompiledForest.load_arrays(model_dir, mmap_mode='r')
+    _worker_calibration = calibration
+    _worker_reasons = reasons
+
+
+def _score_records(header, records):
+    """Parse, extract and score one shard of raw records; returns (rows, CSV text with header)"""
+    results = score_frame(_worker_model, parse_records(header, records), _worker_calibration,
+                          _worker_reasons)
+    return len(results), results.to_csv(index=False)
+
+
+def _score_rows(path, start, stop):
+    """Score rows [start, stop) of a dataset store directory, mapped rather than sent"""
+    frame = _worker_datasets.get(path)
+    if frame is None:
+        frame = _worker_datasets[path] = load(path)
+    results = score_frame(_worker_model, frame.iloc[start:stop], _worker_calibration, _worker_reasons)
+    return len(results), results.to_csv(index=False)
+
+
+def iter_shards(input_path, chunksize, offset=0):
+    """Yield (function, args, end offset) per shard: bytes into a file, rows into a dataset"""
+    if is_dataset(input_path):
+        rows = read_manifest(input_path)['rows']
+        for start in range(offset, rows, chunksize):
+            stop = min(start + chunksize, rows)
+            yield _score_rows, (input_path, start, stop), stop
+        return
+
+    for header, records, end_offset in iter_raw_chunks(input_path, chunksize, offset):
+        yield _score_records, (header, records), end_offset
+
+
+def prepare_model_dir(model_path):
+    """Directory of .npy arrays workers can mmap; exports pickles to a temp dir first
+
+    Returns (directory, whether the caller should delete it).
+    """
+    if os.path.isdir(model_path):
+        return model_path, False
+
+    model = load_model(model_path)
+    if not isinstance(model, CompiledForest):
+        model = CompiledForest.from_model(model)
+    directory = tempfile.mkdtemp(prefix='compiled_forest_')
+    model.save_arrays(directory)
+    return directory, True
+
+
+def score_parallel(model_dir, input_path, output_path, workers=None, chunksize=DEFAULT_CHUNKSIZE,
+                   checkpoint_path=None, resume=False, progress=print_progress, calibration=None,
+                   reasons=0):
+    """Shard input_path across a process pool and write results in input order"""
+    workers = workers or os.cpu_count() or 1
+    # Enough shards in flight to keep every worker busy, few enough to bound memory
+    max_in_flight = workers * 2
+
+    output, offset, rows = open_output(input_path, output_path, checkpoint_path, resume)
+    start = time.perf_counter()
+    resumed_rows = rows
+    pending = deque()
+
+    def write_next():
+        nonlocal rows
+        future, end_offset = pending.popleft()
+        count, text = future.result()
+        if rows:
+            # Every shard carries its own header; keep only the first
+            text = text.split('\n', 1)[1]
+        output.write(text)
+        rows += count
+
+        commit_chunk(output, input_path, end_offset, rows, checkpoint_path)
+        if progress:
+            progress(rows, rows - resumed_rows, time.perf_counter() - start)
+
+    with output, ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(model_dir, calibration, reasons)) as pool:
+        for function, args, end_offset in iter_shards(input_path, chunksize, offset):
+            pending.append((pool.submit(function, *args), end_offset))
+            if len(pending) >= max_in_flight:
+                write_next()
+        while pending:
+            write_next()
+
+    return rows
+
+
+def benchmark_scaling(model_dir, input_path, max_workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Score input_path with 1, 2, 4, ... workers and print the throughput curve"""
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = sorted({min(2 ** i, max_workers) for i in range(max_workers.bit_length() + 1)})
+    output_path = os.path.join(tempfile.mkdtemp(prefix='scaling_'), 'scored.csv')
+
+    print(f"{'workers':>8} {'rows/sec':>12} {'speedup':>8} {'efficiency':>10}")
+    baseline = None
+    try:
+        for workers in counts:
+            start = time.perf_counter()
+            rows = score_parallel(model_dir, input_path, output_path, workers, chunksize, progress=None)
+            rate = rows / (time.perf_counter() - start)
+            baseline = baseline or rate
+            speedup = rate / baseline
+            print(f"{workers:>8} {rate:>12,.0f} {speedup:>8.2f} {speedup / workers:>10.0%}")
+    finally:
+        shutil.rmtree(os.path.dirname(output_path), ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score accounts in parallel across CPU cores")
+    parser.add_argument('input', help="CSV or JSONL file of accounts, or a dataset store directory")
+    parser.add_argument('-o', '--output', help="Output CSV")
+    parser.add_argument('-m', '--model', default=MODEL_PATH,
+                        help="Pickled model, .npz, or directory written by CompiledForest.save_arrays")
+    parser.add_argument('--model-version', default=None,
+                        help="Registered model version to use instead of --model ('latest' for the newest)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows per shard")
+    parser.add_argument('--checkpoint', default=None, help="Checkpoint file updated after every shard")
+    parser.add_argument('--resume', action='store_true', help="Continue from --checkpoint")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Measure throughput for 1..--workers processes instead of scoring")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Decision threshold on the calibrated probability (default: the stored one)")
+    parser.add_argument('--no-calibration', action='store_true',
+                        help="Leave out calibrated_probability/flagged even if the model has a calibration")
+    parser.add_argument('--reasons', type=int, default=0, metavar='K',
+                        help="Add the K features contributing most to each fake probability")
+    args = parser.parse_args(argv)
+
+    if not args.benchmark and not args.output:
+        parser.error("--output is required unless --benchmark is given")
+
+    model_path = resolve_model_path(args.model, args.model_version)
+    calibration = None if args.no_calibration else load_for(model_path)
+    if args.threshold is not None:
+        if calibration is None:
+            parser.error("--threshold needs a calibrated model (see calibration.py fit)")
+        calibration.threshold = args.threshold
+
+    model_dir, temporary = prepare_model_dir(model_path)
+    try:
+        if args.benchmark:
+            benchmark_scaling(model_dir, args.input, args.workers, args.chunksize)
+        else:
+            total = score_parallel(model_dir, args.input, args.output, args.workers, args.chunksize,
+                                   args.checkpoint, args.resume, calibration=calibration,
+                                   reasons=args.reasons)
+            print(f"Scored {total} accounts", file=sys.stderr)
+    finally:
+        if temporary:
+            shutil.rmtree(model_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
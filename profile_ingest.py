@@ -0,0 +1,360 @@
+# profile_ingest.py
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import zlib
+from urllib.parse import quote, urlsplit
+
+import pandas as pd
+
+from features import PROFILE_FIELDS
+from scoring import MODEL_PATH, features_from_frame, load_model, resolve_model_path, score_frame
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_BATCH_SIZE = 256
+# Longest a partial batch waits for more profiles before it is scored
+FLUSH_MS = 50
+RETRIES = 3
+BACKOFF_SECONDS = 0.05
+REQUEST_TIMEOUT = 10
+# Statuses worth retrying; other errors are reported once
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, at most `size` open at a time"""
+
+    def __init__(self, host, port, size=DEFAULT_CONCURRENCY):
+        self.host = host
+        self.port = port
+        self.idle = []
+        self.slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def acquire(self, fresh=False):
+        """An idle connection, or a new one when there is none or fresh is set"""
+        await self.slots.acquire()
+        if self.idle:
+            if not fresh:
+                return self.idle.pop()
+            # Keep at most `size` connections open: the new one replaces an idle one
+            self.idle.pop()[1].close()
+        try:
+            connection = await asyncio.open_connection(self.host, self.port)
+        except BaseException:
+            self.slots.release()
+            raise
+        self.opened += 1
+        return connection
+
+    def release(self, connection, reusable=True):
+        if reusable:
+            self.idle.append(connection)
+        else:
+            connection[1].close()
+        self.slots.release()
+
+    async def close(self):
+        idle, self.idle = self.idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def get_json(self, path, timeout=REQUEST_TIMEOUT, fresh=False):
+        """GET path and decode the JSON body; raises FetchError"""
+        connection = await self.acquire(fresh)
+        reusable = False
+        try:
+            status, body, reusable = await asyncio.wait_for(self._request(connection, path), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            raise FetchError(f"{type(e).__name__}: {e}") from e
+        finally:
+            self.release(connection, reusable)
+
+        if status != 200:
+            raise FetchError(f"HTTP {status} for {path}", retryable=status in RETRY_STATUSES)
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise FetchError(f"Invalid JSON for {path}", retryable=False) from e
+
+    async def _request(self, connection, path):
+        reader, writer = connection
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\nAccept: application/json\r\n\r\n"
+                     .encode('latin-1'))
+        await writer.drain()
+
+        # An idle keep-alive connection the server has closed reads as b''
+        status_line = (await reader.readline()).split()
+        if len(status_line) < 2 or not status_line[1].isdigit():
+            raise FetchError(f"Bad status line for {path}: {b' '.join(status_line)!r}")
+        status = int(status_line[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if 'content-length' not in headers:
+            raise FetchError(f"No Content-Length for {path}", retryable=False)
+
+        body = await reader.readexactly(int(headers['content-length']))
+        return status, body, headers.get('connection', '').lower() != 'close'
+
+
+async def fetch_profile(pool, path, retries=RETRIES, backoff=BACKOFF_SECONDS):
+    """Fetch one profile, retrying transient failures with jittered exponential backoff"""
+    for attempt in range(retries + 1):
+        try:
+            # Retries go out on a new connection in case the pooled one had gone stale
+            return await pool.get_json(path, fresh=attempt > 0)
+        except FetchError as e:
+            if not e.retryable or attempt == retries:
+                raise
+            await asyncio.sleep(backoff * 2 ** attempt * (0.5 + random.random()))
+
+
+class IngestStats:
+    def __init__(self):
+        self.fetched = 0
+        self.failed = 0
+        self.scored = 0
+        self.batches = 0
+        self.start = time.perf_counter()
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.start
+        return self.scored / elapsed if elapsed > 0 else 0.0
+
+
+async def _fetch_worker(pool, usernames, profiles, path_template, stats):
+    for username in usernames:
+        path = path_template.format(username=quote(username, safe=''))
+        try:
+            profile = await fetch_profile(pool, path)
+        except FetchError as e:
+            stats.failed += 1
+            print(f"Skipping {username}: {e}", file=sys.stderr)
+            continue
+        stats.fetched += 1
+        # Blocks when scoring falls behind, which in turn slows the fetchers down
+        await profiles.put(profile)
+
+
+async def _next_batch(profiles, batch_size):
+    """Wait for one profile, then take more until the batch is full or FLUSH_MS passes"""
+    batch = [await profiles.get()]
+    deadline = time.monotonic() + FLUSH_MS / 1000
+    while len(batch) < batch_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(profiles.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+def _score_batch(model, frame):
+    """(results, skipped): scores for a batch, leaving out profiles whose features can't be built
+
+    skipped lists (username, error) for each profile left out; results is None if none are left.
+    """
+    try:
+        return score_frame(model, frame), []
+    except Exception:
+        pass
+    # Find the bad profiles one by one, then score the rest together
+    valid, skipped = [], []
+    for i in range(len(frame)):
+        try:
+            features_from_frame(frame.iloc[i:i + 1])
+        except Exception as e:
+            skipped.append((frame['username'].iloc[i], e))
+        else:
+            valid.append(i)
+    return (score_frame(model, frame.iloc[valid]) if valid else None), skipped
+
+
+async def _score_worker(model, profiles, batch_size, on_results, stats):
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = await _next_batch(profiles, batch_size)
+        if batch[-1] is None:
+            batch.pop()
+            done = True
+        else:
+            done = False
+        if batch:
+            frame = pd.DataFrame.from_records(batch, columns=PROFILE_FIELDS)
+            try:
+                # predict_proba releases the event loop by running on a thread
+                results, skipped = await loop.run_in_executor(None, _score_batch, model, frame)
+                if results is not None:
+                    on_results(results)
+            except Exception as e:
+                # An error that isn't down to one profile must not stop the scorer either,
+                # or the fetchers would block forever on the full queue
+                stats.failed += len(batch)
+                print(f"Skipping a batch of {len(batch)} profiles: {type(e).__name__}: {e}",
+                      file=sys.stderr)
+            else:
+                for username, e in skipped:
+                    print(f"Skipping {username}: {type(e).__name__}: {e}", file=sys.stderr)
+                stats.failed += len(skipped)
+                if results is not None:
+                    stats.scored += len(results)
+                    stats.batches += 1
+        if done:
+            return
+
+
+async def ingest(model, source, usernames, on_results, path_template='/profiles/{username}',
+                 concurrency=DEFAULT_CONCURRENCY, batch_size=DEFAULT_BATCH_SIZE):
+    """Fetch profiles concurrently from source and score them in batches; returns IngestStats"""
+    url = urlsplit(source)
+    pool = ConnectionPool(url.hostname, url.port or 80, concurrency)
+    profiles = asyncio.Queue(maxsize=batch_size * 2)
+    stats = IngestStats()
+
+    # Every fetcher pulls from one shared iterator, so usernames are only read as needed
+    usernames = iter(usernames)
+    scorer = asyncio.ensure_future(_score_worker(model, profiles, batch_size, on_results, stats))
+    fetchers = asyncio.gather(*(
+        _fetch_worker(pool, usernames, profiles, url.path.rstrip('/') + path_template, stats)
+        for _ in range(concurrency)
+    ))
+    try:
+        # Should the scorer still die, stop fetching instead of waiting on the full queue
+        await asyncio.wait([fetchers, scorer], return_when=asyncio.FIRST_COMPLETED)
+        if scorer.done():
+            scorer.result()
+        await fetchers
+        await profiles.put(None)
+        await scorer
+    finally:
+        fetchers.cancel()
+        scorer.cancel()
+        await pool.close()
+    return stats
+
+
+async def serve_stub_profiles(host='127.0.0.1', port=0, latency_ms=0.0, failure_rate=0.0,
+                              pool_size=10000, seed=42):
+    """Local stand-in for the metadata service: GET /profiles/<username> returns a synthetic profile
+
+    failure_rate of requests get a 503 so retries are exercised. Returns the asyncio server.
+    """
+    from benchmark import synthetic_profiles
+
+    records = synthetic_profiles(pool_size, seed=seed).to_dict('records')
+    rng = random.Random(seed)
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    break
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                username = request.split()[1].decode('latin-1').rsplit('/', 1)[-1]
+                if latency_ms:
+                    await asyncio.sleep(latency_ms / 1000)
+
+                if rng.random() < failure_rate:
+                    status, body = '503 Service Unavailable', b'{}'
+                else:
+                    profile = dict(records[zlib.crc32(username.encode()) % len(records)], username=username)
+                    status, body = '200 OK', json.dumps(profile, default=int).encode('utf-8')
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def run_with_stub(model, count, output, concurrency, batch_size, latency_ms, failure_rate):
+    """Score `count` accounts against a local stub server and report accounts/sec"""
+    server = await serve_stub_profiles(latency_ms=latency_ms, failure_rate=failure_rate)
+    host, port = server.sockets[0].getsockname()[:2]
+    async with server:
+        usernames = (f"user{i}" for i in range(count))
+        stats = await ingest(model, f"http://{host}:{port}", usernames, output,
+                             concurrency=concurrency, batch_size=batch_size)
+        # Let the handlers see the closed connections before the loop shuts down
+        await asyncio.sleep(0.01)
+        return stats
+
+
+def csv_writer(stream):
+    """on_results callback appending scored batches to a CSV stream"""
+    state = {'header': True}
+
+    def write(results):
+        results.to_csv(stream, header=state['header'], index=False)
+        state['header'] = False
+    return write
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch profiles from the metadata service and score them")
+    parser.add_argument('usernames', nargs='?', help="File with one username per line")
+    parser.add_argument('--source', help="Base URL of the metadata service, e.g. http://meta:8080")
+    parser.add_argument('--path-template', default='/profiles/{username}')
+    parser.add_argument('-o', '--output', default='-', help="Output CSV (default: stdout)")
+    parser.add_argument('-m', '--model', default=MODEL_PATH)
+    parser.add_argument('--model-version', default=None, help="Registered model version to use")
+    parser.add_argument('-c', '--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="Requests in flight (and pooled connections)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--stub', type=int, default=None, metavar='N',
+                        help="Score N accounts from a local stub server instead of --source")
+    parser.add_argument('--stub-latency-ms', type=float, default=0.0)
+    parser.add_argument('--stub-failure-rate', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    if args.stub is None and not (args.usernames and args.source):
+        parser.error("give a usernames file and --source, or --stub N")
+
+    model = load_model(resolve_model_path(args.model, args.model_version))
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    try:
+        if args.stub is not None:
+            stats = asyncio.run(run_with_stub(model, args.stub, csv_writer(output), args.concurrency,
+                                              args.batch_size, args.stub_latency_ms,
+                                              args.stub_failure_rate))
+        else:
+            with open(args.usernames) as f:
+                usernames = (line.strip() for line in f if line.strip())
+                stats = asyncio.run(ingest(model, args.source, usernames, csv_writer(output),
+                                           args.path_template, args.concurrency, args.batch_size))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Scored {stats.scored} accounts in {stats.batches} batches ({stats.failed} failed), "
+          f"{stats.rate():,.0f} accounts/sec", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# score_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from calibration import CALIBRATION_NAME
+from drift_monitor import REFERENCE_NAME, observe
+from features import FEATURE_COLUMNS
+from file_utils import atomic_write
+from scoring import score_features
+
+RESULT_COLUMNS = ['prediction', 'confidence', 'fake_probability']
+
+
+def model_version(path):
+    """Short content hash of a model file or array directory, so cached scores never outlive their model
+
+    The calibration and drift reference stored in a directory are not part of
+    the model, and they record this hash themselves.
+    """
+    digest = hashlib.sha1()
+    paths = [path]
+    if os.path.isdir(path):
+        paths = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                 if name not in (CALIBRATION_NAME, REFERENCE_NAME)]
+    for file_path in paths:
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+class ScoreCache:
+    """Bounded LRU/TTL cache of scores keyed on the extracted feature vector"""
+
+    def __init__(self, maxsize=100000, ttl=None, model_version='', path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.model_version = model_version
+        self.path = path
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._salt = model_version.encode('utf-8')
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def set_model_version(self, model_version):
+        """Switch to a new model, dropping every score from the old one"""
+        with self.lock:
+            self.entries.clear()
+            self.model_version = model_version
+            self._salt = model_version.encode('utf-8')
+
+    def _key_from_vector(self, vector):
+        return hashlib.blake2b(vector.tobytes(), digest_size=16, key=self._salt[:64]).hexdigest()
+
+    def key(self, features):
+        """Hash of the feature vector in model column order"""
+        vector = np.array([features[column] for column in FEATURE_COLUMNS], dtype='<f8')
+        return self._key_from_vector(vector)
+
+    def keys_for_frame(self, X):
+        """Hash every row of a feature matrix"""
+        matrix = np.ascontiguousarray(X[FEATURE_COLUMNS].to_numpy(dtype='<f8'))
+        return [self._key_from_vector(row) for row in matrix]
+
+    def _lookup(self, key, now):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, result = entry
+        if expires_at is not None and expires_at <= now:
+            del self.entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def _store(self, key, result, now):
+        expires_at = now + self.ttl if self.ttl else None
+        self.entries[key] = (expires_at, tuple(result))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, features):
+        """Cached (prediction, confidence, fake_probability) or None"""
+        key = self.key(features)
+        with self.lock:
+            return self._lookup(key, time.time())
+
+    def put(self, features, result, model_version=None):
+        """Remember a result; skipped if the cache has moved on from model_version since it was scored"""
+        with self.lock:
+            if model_version is not None and model_version != self.model_version:
+                return
+            self._store(self.key(features), result, time.time())
+
+    def get_or_score(self, features, score):
+        """Return the cached result or compute it with score() and remember it"""
+        key = self.key(features)
+        with self.lock:
+            result = self._lookup(key, time.time())
+        if result is None:
+            result = tuple(score())
+            with self.lock:
+                self._store(key, result, time.time())
+        return result
+
+    def score_frame(self, model, X, model_version=None):
+        """Score a feature matrix, running the model only on rows not in the cache
+
+        model_version is the cache version read before `model` was, so a model
+        swapped in meanwhile never has its scores cached under the other's version.
+        Cached rows are passed to the drift monitor as well as scored ones.
+        """
+        if model_version is not None and model_version != self.model_version:
+            return score_features(model, X)[RESULT_COLUMNS]
+        keys = self.keys_for_frame(X)
+        now = time.time()
+        with self.lock:
+            cached = [self._lookup(key, now) for key in keys]
+
+        hits = [i for i, result in enumerate(cached) if result is not None]
+        if hits:
+            # Scored rows reach the drift monitor through score_features
+            observe(X.iloc[hits], [cached[i][0] for i in hits])
+        missing = [i for i, result in enumerate(cached) if result is None]
+        if missing:
+            scored = score_features(model, X.iloc[missing])
+            rows = list(zip(*(scored[column] for column in RESULT_COLUMNS)))
+            with self.lock:
+                current = model_version is None or model_version == self.model_version
+                for i, result in zip(missing, rows):
+                    cached[i] = result
+                    if current:
+                        self._store(keys[i], result, now)
+
+        return pd.DataFrame(cached, columns=RESULT_COLUMNS, index=X.index)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def save(self, path=None):
+        """Write live entries to a JSON file (atomically replaced)"""
+        path = path or self.path
+        now = time.time()
+        with self.lock:
+            entries = [
+                [key, expires_at, [float(value) for value in result]]
+                for key, (expires_at, result) in self.entries.items()
+                if expires_at is None or expires_at > now
+            ]
+        with atomic_write(path) as f:
+            json.dump({'model_version': self.model_version, 'entries': entries}, f)
+
+    def load(self, path=None):
+        """Warm the cache from a file written by save(); entries for other models are skipped"""
+        path = path or self.path
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get('model_version') != self.model_version:
+            return 0
+
+        now = time.time()
+        loaded = 0
+        with self.lock:
+            for key, expires_at, result in data.get('entries', []):
+                if expires_at is not None and expires_at <= now:
+                    continue
+                prediction, confidence, fake_probability = result
+                self.entries[key] = (expires_at, (int(prediction), confidence, fake_probability))
+                loaded += 1
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return loaded
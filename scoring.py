@@ -0,0 +1,240 @@
+# scoring.py
+import argparse
+import os
+import sys
+from contextlib import nullcontext
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from calibration import load_for
+from compiled_forest import CompiledForest
+from dataset_store import is_dataset, iter_chunks
+from drift_monitor import monitor_for, observe, set_monitor
+from features import FEATURE_COLUMNS, extract_features_frame
+from instrumentation import JsonLogSink, profile, set_sink, stage
+
+MODEL_PATH = 'models/random_forest_model.pkl'
+DEFAULT_CHUNKSIZE = 100000
+
+# Text fields must stay strings (e.g. usernames like "00123")
+TEXT_FIELDS = ['username', 'fullname', 'bio']
+# Columns copied from the input into the scored output when present
+ID_FIELDS = ['id', 'username']
+
+
+def resolve_model_path(path=MODEL_PATH, version=None):
+    """Path to load: the registry directory of version when one is given, else path"""
+    if version is None:
+        return path
+    from model_registry import version_dir
+
+    return version_dir(version)
+
+
+def load_model(path=MODEL_PATH):
+    """Load the trained classifier (.npz files and array directories load the compiled forest)"""
+    if os.path.isdir(path):
+        from model_registry import is_version_dir, load_dir
+
+        if is_version_dir(path):
+            return load_dir(path)
+    if path.endswith('.npz') or os.path.isdir(path):
+        return CompiledForest.load(path)
+    return joblib.load(path)
+
+
+def read_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrame chunks from a CSV or JSONL file, or a dataset store directory"""
+    if is_dataset(path):
+        return iter_chunks(path, chunksize)
+    if path.endswith(('.jsonl', '.ndjson')):
+        return pd.read_json(path, lines=True, dtype=False, chunksize=chunksize)
+    return pd.read_csv(
+        path,
+        chunksize=chunksize,
+        dtype={field: str for field in TEXT_FIELDS},
+        keep_default_na=False,
+    )
+
+
+def features_from_frame(frame):
+    """Build the model feature matrix for a chunk of input rows"""
+    # Rows that already carry the engineered features (e.g. Data/test.csv)
+    if set(FEATURE_COLUMNS).issubset(frame.columns):
+        return frame[FEATURE_COLUMNS]
+
+    with stage('validate'):
+        if 'username' not in frame.columns:
+            raise ValueError("Input needs either the model feature columns or raw profile fields")
+
+    with stage('extract_features'):
+        return extract_features_frame(frame)[FEATURE_COLUMNS]
+
+
+def top_reasons(model, X, k):
+    """The k features with the largest contributions to each row's fake probability
+
+    Columns reason_1..k name the feature and reason_i_contribution give its
+    signed share of the probability (positive pushes towards fake).
+    """
+    with stage('explain'):
+        _, contributions = model.contributions(X, list(model.classes_).index(1))
+    order = np.argsort(-np.abs(contributions), axis=1)[:, :k]
+    names = np.asarray(FEATURE_COLUMNS)
+    columns = {}
+    for i in range(order.shape[1]):
+        columns[f'reason_{i + 1}'] = names[order[:, i]]
+        columns[f'reason_{i + 1}_contribution'] = np.take_along_axis(contributions, order[:, i:i + 1], axis=1)[:, 0]
+    return pd.DataFrame(columns, index=X.index)
+
+
+def score_features(model, X, calibration=None, reasons=0):
+    """Score a feature matrix with a single predict_proba call
+
+    With a calibration, also returns its calibrated fake probability and whether
+    that reaches the calibration's decision threshold. reasons > 0 adds that many
+    top_reasons columns (model must be a CompiledForest).
+    """
+    with stage('predict_proba'):
+        probabilities = model.predict_proba(X)
+    best = probabilities.argmax(axis=1)
+    fake_index = list(model.classes_).index(1)
+
+    results = pd.DataFrame({
+        'prediction': model.classes_[best],
+        'confidence': probabilities.max(axis=1) * 100,
+        'fake_probability': probabilities[:, fake_index],
+    }, index=X.index)
+    observe(X, results['prediction'].to_numpy())
+    if calibration is not None:
+        calibrated = calibration.transform(probabilities[:, fake_index])
+        results['calibrated_probability'] = calibrated
+        results['flagged'] = (calibrated >= calibration.threshold).astype(np.int8)
+    if reasons:
+        results = pd.concat([results, top_reasons(model, X, reasons)], axis=1)
+    return results
+
+
+class RecordScorer:
+    """Score one feature dict at a time with a single pass over the compiled forest
+
+    The row buffer is preallocated in FEATURE_COLUMNS order, so there is no
+    DataFrame or column alignment per call. Not thread-safe: use one per thread.
+    """
+
+    def __init__(self, model):
+        if not isinstance(model, CompiledForest):
+            model = CompiledForest.from_model(model)
+        if list(model.feature_names_in_) != FEATURE_COLUMNS:
+            raise ValueError("Model feature order does not match FEATURE_COLUMNS")
+        self.model = model
+        self.classes = model.classes_
+        self.fake_index = list(model.classes_).index(1)
+        self.row = np.zeros((1, len(FEATURE_COLUMNS)), dtype=np.float32)
+
+    def score(self, features):
+        """(prediction, confidence %, fake probability) for one feature dict"""
+        values = self.row[0]
+        for i, column in enumerate(FEATURE_COLUMNS):
+            values[i] = features[column]
+        with stage('score_record'):
+            probabilities = self.model.predict_proba(self.row)[0]
+        best = probabilities.argmax()
+        return self.classes[best], probabilities[best] * 100, probabilities[self.fake_index]
+
+    def explain(self, features):
+        """Contribution of each feature to the fake probability of one feature dict"""
+        # Own row buffer, so explaining on one thread never races score() on another
+        row = np.array([[features[column] for column in FEATURE_COLUMNS]], dtype=np.float32)
+        with stage('explain'):
+            _, contributions = self.model.contributions(row, self.fake_index)
+        return dict(zip(FEATURE_COLUMNS, contributions[0]))
+
+
+def score_frame(model, frame, calibration=None, reasons=0):
+    """Extract features and score a chunk of input rows"""
+    results = score_features(model, features_from_frame(frame), calibration, reasons)
+    ids = [field for field in ID_FIELDS if field in frame.columns]
+    if ids:
+        results = pd.concat([frame[ids], results], axis=1)
+    return results
+
+
+def score_file(model, input_path, output, chunksize=DEFAULT_CHUNKSIZE, calibration=None, reasons=0):
+    """Score every row of input_path and write results as CSV chunk by chunk"""
+    total = 0
+    for chunk in read_chunks(input_path, chunksize):
+        results = score_frame(model, chunk, calibration, reasons)
+        results.to_csv(output, header=(total == 0), index=False)
+        total += len(results)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score Instagram accounts in bulk")
+    parser.add_argument('input', help="CSV or JSONL file of accounts, or a dataset store directory")
+    parser.add_argument('-o', '--output', default='-', help="Output CSV (default: stdout)")
+    parser.add_argument('-m', '--model', default=MODEL_PATH, help="Path to the trained model")
+    parser.add_argument('--model-version', default=None,
+                        help="Registered model version to use instead of --model ('latest' for the newest)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Rows scored per predict_proba call")
+    parser.add_argument('--checkpoint', default=None,
+                        help="Checkpoint file updated after every chunk (file output only)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue from --checkpoint instead of starting over")
+    parser.add_argument('--metrics-log', default=None,
+                        help="Append per-stage timings as JSON lines to this file")
+    parser.add_argument('--profile', default=None,
+                        help="Write a cProfile capture of the run to this file")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Decision threshold on the calibrated probability (default: the stored one)")
+    parser.add_argument('--no-calibration', action='store_true',
+                        help="Leave out calibrated_probability/flagged even if the model has a calibration")
+    parser.add_argument('--reasons', type=int, default=0, metavar='K',
+                        help="Add the K features contributing most to each fake probability")
+    parser.add_argument('--drift', action='store_true',
+                        help="Compare scored rows with the model's training reference and report drift")
+    parser.add_argument('--drift-log', default=None,
+                        help="Append each drift window's figures as JSON lines to this file (implies --drift)")
+    args = parser.parse_args(argv)
+
+    model_path = resolve_model_path(args.model, args.model_version)
+    monitor = monitor_for(model_path, args.drift_log) if args.drift or args.drift_log else None
+    set_monitor(monitor)
+    model = load_model(model_path)
+    if args.reasons and not isinstance(model, CompiledForest):
+        # Explanations walk the flattened arrays
+        model = CompiledForest.from_model(model)
+    calibration = None if args.no_calibration else load_for(model_path)
+    if args.threshold is not None:
+        if calibration is None:
+            parser.error("--threshold needs a calibrated model (see calibration.py fit)")
+        calibration.threshold = args.threshold
+    sink = JsonLogSink(args.metrics_log) if args.metrics_log else None
+    set_sink(sink)
+
+    with profile(args.profile) if args.profile else nullcontext():
+        if args.output == '-':
+            total = score_file(model, args.input, sys.stdout, args.chunksize, calibration, args.reasons)
+        else:
+            from streaming import score_stream
+
+            output_dir = os.path.dirname(args.output)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+            total = score_stream(model, args.input, args.output, args.chunksize,
+                                 args.checkpoint, args.resume, calibration=calibration,
+                                 reasons=args.reasons)
+
+    if sink is not None:
+        sink.close()
+    if monitor is not None:
+        monitor.flush()
+    print(f"Scored {total} accounts", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
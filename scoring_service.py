@@ -0,0 +1,366 @@
+# scoring_service.py
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from drift_monitor import DEFAULT_WINDOW, get_monitor, monitor_for, observe, set_monitor
+from features import FEATURE_COLUMNS, extract_features, extract_features_frame, normalize_profile
+from instrumentation import HistogramSink, JsonLogSink, MultiSink, set_sink, stage
+from model_reload import ModelWatcher
+from score_cache import ScoreCache, model_version
+from scoring import MODEL_PATH, load_model, resolve_model_path, score_features
+
+# Seconds a single request waits for its micro-batch before giving up
+REQUEST_TIMEOUT = 10
+# Latency samples kept for the percentile counters
+LATENCY_WINDOW = 10000
+
+
+class ServiceStats:
+    """Thread-safe request counters and latency percentiles"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_rows = 0
+
+    def record_request(self, seconds, ok=True):
+        with self.lock:
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+            self.latencies.append(seconds * 1000)
+
+    def record_batch(self, size):
+        with self.lock:
+            self.batches += 1
+            self.batched_rows += size
+
+    def percentile(self, samples, q):
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+    def snapshot(self, queue_depth=0):
+        """Current counters as a JSON-serialisable dict"""
+        with self.lock:
+            samples = sorted(self.latencies)
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'batches': self.batches,
+                'mean_batch_size': self.batched_rows / self.batches if self.batches else 0.0,
+                'queue_depth': queue_depth,
+                'latency_ms_p50': self.percentile(samples, 50),
+                'latency_ms_p99': self.percentile(samples, 99),
+            }
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-account requests into one predict_proba call"""
+
+    def __init__(self, model, max_batch_size=64, max_wait_ms=5, stats=None):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats or ServiceStats()
+        self.queue = queue.Queue()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    @property
+    def queue_depth(self):
+        return self.queue.qsize()
+
+    def submit(self, features):
+        """Queue one feature dict and return a Future for its result"""
+        future = Future()
+        self.queue.put((features, future))
+        return future
+
+    def _collect(self):
+        """Block for the first request, then gather more until the batch is full or the wait expires"""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Read once per batch: a hot swap replaces self.model between batches
+            model = self.model
+            try:
+                with stage('dataframe'):
+                    X = pd.DataFrame([features for features, _ in batch], columns=FEATURE_COLUMNS)
+                results = format_results(score_features(model, X))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.stats.record_batch(len(batch))
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+def format_result(prediction, confidence, fake_probability):
+    """One score as a JSON-ready dict"""
+    return {
+        'prediction': int(prediction),
+        'label': 'fake' if prediction == 1 else 'genuine',
+        'confidence': float(confidence),
+        'fake_probability': float(fake_probability),
+    }
+
+
+def format_results(scores):
+    """Turn a score_features frame into a list of JSON-ready dicts"""
+    return [
+        format_result(*row)
+        for row in zip(scores['prediction'], scores['confidence'], scores['fake_probability'])
+    ]
+
+
+def validate_profile(record):
+    """Reject payloads the model can't score"""
+    with stage('validate'):
+        if not isinstance(record, dict):
+            raise ValueError("Each account must be a JSON object")
+        if not str(record.get('username') or '').strip():
+            raise ValueError("Please enter a username")
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints: POST /score, POST /score/batch, GET /stats, GET /metrics, GET /health"""
+
+    def log_message(self, format, *args):
+        # Keep the request log quiet; /stats carries the numbers
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def _send_metrics(self):
+        """Stage histograms in Prometheus text format"""
+        histograms = self.server.histograms
+        if histograms is None:
+            self._send_json(404, {'error': 'Metrics are disabled; start with --metrics'})
+            return
+        body = histograms.to_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            batcher = self.server.batcher
+            stats = batcher.stats.snapshot(batcher.queue_depth)
+            if self.server.cache is not None:
+                stats['cache'] = self.server.cache.stats()
+            self._send_json(200, stats)
+        elif self.path == '/metrics':
+            self._send_metrics()
+        elif self.path == '/drift':
+            monitor = get_monitor()
+            if monitor is None:
+                self._send_json(404, {'error': "Drift monitoring is off (start with --drift)"})
+            else:
+                self._send_json(200, monitor.last_result or {'rows': monitor.rows, 'alerts': []})
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path not in ('/score', '/score/batch'):
+            self._send_json(404, {'error': 'Not found'})
+            return
+
+        start = time.perf_counter()
+        ok = False
+        try:
+            payload = self._read_json()
+            if self.path == '/score':
+                result = self.score_one(payload)
+            else:
+                result = self.score_batch(payload)
+            self._send_json(200, result)
+            ok = True
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            self._send_json(500, {'error': f"An error occurred: {str(e)}"})
+        finally:
+            self.server.batcher.stats.record_request(time.perf_counter() - start, ok)
+
+    def score_one(self, record):
+        """Score a single account through the micro-batcher"""
+        validate_profile(record)
+        with stage('extract_features'):
+            features = extract_features(*normalize_profile(record))
+
+        cache = self.server.cache
+        if cache is not None:
+            # Read before submitting: a swap sets the model first, then the cache version
+            version = cache.model_version
+            cached = cache.get(features)
+            if cached is not None:
+                # Hits skip score_features, so the drift monitor is fed here
+                observe(np.array([[features[column] for column in FEATURE_COLUMNS]]), [cached[0]])
+                return format_result(*cached)
+
+        result = self.server.batcher.submit(features).result(timeout=REQUEST_TIMEOUT)
+        if cache is not None:
+            cache.put(features, (result['prediction'], result['confidence'], result['fake_probability']),
+                      version)
+        return result
+
+    def score_batch(self, payload):
+        """Score a list of accounts with one predict_proba call"""
+        records = payload.get('accounts') if isinstance(payload, dict) else payload
+        if not isinstance(records, list):
+            raise ValueError("Expected a JSON list of accounts")
+        for record in records:
+            validate_profile(record)
+        if not records:
+            return {'results': []}
+
+        with stage('extract_features'):
+            X = extract_features_frame(pd.DataFrame(records))[FEATURE_COLUMNS]
+        cache = self.server.cache
+        if cache is not None:
+            version = cache.model_version
+            scores = cache.score_frame(self.server.batcher.model, X, version)
+        else:
+            scores = score_features(self.server.batcher.model, X)
+        self.server.batcher.stats.record_batch(len(records))
+        return {'results': format_results(scores)}
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The socketserver default backlog of 5 resets connections under concurrent load
+    request_queue_size = 128
+
+
+def create_server(model, host='127.0.0.1', port=8000, max_batch_size=64, max_wait_ms=5,
+                  cache=None, histograms=None):
+    """Build the HTTP server with its micro-batcher (and optional score cache and metrics) attached"""
+    server = ScoringHTTPServer((host, port), ScoringRequestHandler)
+    if hasattr(model, 'warm'):
+        model.warm()
+    server.batcher = MicroBatcher(model, max_batch_size, max_wait_ms)
+    server.cache = cache
+    server.histograms = histograms
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the authenticity model over HTTP/JSON")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('-m', '--model', default=MODEL_PATH, help="Path to the trained model")
+    parser.add_argument('--model-version', default=None,
+                        help="Registered model version to serve instead of --model ('latest' for the newest)")
+    parser.add_argument('--max-batch-size', type=int, default=64,
+                        help="Most single requests coalesced into one predict_proba call")
+    parser.add_argument('--max-wait-ms', type=float, default=5,
+                        help="Longest a request waits for others to join its batch")
+    parser.add_argument('--cache-size', type=int, default=100000,
+                        help="Scores kept in the LRU cache (0 disables caching)")
+    parser.add_argument('--cache-ttl', type=float, default=None,
+                        help="Seconds a cached score stays valid (default: no expiry)")
+    parser.add_argument('--cache-file', default=None,
+                        help="JSON file used to persist the cache across restarts")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Time each scoring stage and expose histograms at GET /metrics")
+    parser.add_argument('--metrics-log', default=None,
+                        help="Append per-stage timings as JSON lines to this file")
+    parser.add_argument('--reload-interval', type=float, default=None,
+                        help="Seconds between checks for a replaced model file or a newer "
+                             "registry version (default: never reload)")
+    parser.add_argument('--drift', action='store_true',
+                        help="Compare scored traffic with the model's training reference; GET /drift")
+    parser.add_argument('--drift-log', default=None,
+                        help="Append each drift window's figures as JSON lines to this file (implies --drift)")
+    parser.add_argument('--drift-window', type=int, default=DEFAULT_WINDOW,
+                        help="Scored rows per drift comparison")
+    args = parser.parse_args(argv)
+
+    histograms = HistogramSink() if args.metrics else None
+    sinks = [histograms] if histograms is not None else []
+    if args.metrics_log:
+        sinks.append(JsonLogSink(args.metrics_log))
+    if sinks:
+        set_sink(sinks[0] if len(sinks) == 1 else MultiSink(*sinks))
+
+    model_path = resolve_model_path(args.model, args.model_version)
+    drift = args.drift or args.drift_log
+    if drift:
+        set_monitor(monitor_for(model_path, args.drift_log, window=args.drift_window))
+
+    cache = None
+    if args.cache_size > 0:
+        cache = ScoreCache(args.cache_size, args.cache_ttl, model_version(model_path), args.cache_file)
+
+    server = create_server(load_model(model_path), args.host, args.port,
+                           args.max_batch_size, args.max_wait_ms, cache, histograms)
+    if args.reload_interval:
+        def swap_model(model, path):
+            # Model first: requests that read the old cache version never cache under the new one
+            server.batcher.model = model
+            if cache is not None:
+                cache.set_model_version(model_version(path))
+            if drift:
+                # A new model is compared with its own training reference
+                try:
+                    set_monitor(monitor_for(path, args.drift_log, window=args.drift_window))
+                except (FileNotFoundError, ValueError) as e:
+                    print(f"Keeping the previous drift reference: {e}")
+            print(f"Reloaded model from {path}")
+
+        ModelWatcher(args.model, args.model_version, swap_model, args.reload_interval).start()
+
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if cache is not None and args.cache_file:
+            cache.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# streaming.py
+import io
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from dataset_store import is_dataset, load
+from file_utils import atomic_write
+from scoring import DEFAULT_CHUNKSIZE, TEXT_FIELDS, score_frame
+
+
+def is_jsonl(path):
+    return path.endswith(('.jsonl', '.ndjson'))
+
+
+def _read_csv_record(f):
+    """Read one CSV record, following quoted fields across line breaks"""
+    record = f.readline()
+    # An odd number of quotes means a quoted field (e.g. a multi-line bio) is still open
+    while record and record.count(b'"') % 2:
+        line = f.readline()
+        if not line:
+            break
+        record += line
+    return record
+
+
+def _parse_csv(header, records):
+    return pd.read_csv(
+        io.BytesIO(header + b''.join(records)),
+        dtype={field: str for field in TEXT_FIELDS},
+        keep_default_na=False,
+    )
+
+
+def _parse_jsonl(records):
+    return pd.DataFrame.from_records([json.loads(record) for record in records])
+
+
+def iter_raw_chunks(path, chunksize=DEFAULT_CHUNKSIZE, start_offset=0):
+    """Yield (header, raw record lines, byte offset just past them) without parsing"""
+    jsonl = is_jsonl(path)
+    with open(path, 'rb') as f:
+        header = b'' if jsonl else _read_csv_record(f)
+        if start_offset:
+            f.seek(start_offset)
+
+        while True:
+            records = []
+            while len(records) < chunksize:
+                record = f.readline() if jsonl else _read_csv_record(f)
+                if not record:
+                    break
+                if record.strip():
+                    records.append(record)
+            if not records:
+                return
+            yield header, records, f.tell()
+
+
+def parse_records(header, records):
+    """Parse raw lines from iter_raw_chunks (an empty header means JSONL)"""
+    return _parse_csv(header, records) if header else _parse_jsonl(records)
+
+
+def iter_record_chunks(path, chunksize=DEFAULT_CHUNKSIZE, start_offset=0):
+    """Yield (chunk DataFrame, offset just past the chunk) with bounded memory
+
+    Offsets are bytes into a file, or rows into a dataset store directory.
+    """
+    if is_dataset(path):
+        frame = load(path)
+        for start in range(start_offset, len(frame), chunksize):
+            yield frame.iloc[start:start + chunksize], min(start + chunksize, len(frame))
+        return
+
+    for header, records, offset in iter_raw_chunks(path, chunksize, start_offset):
+        yield parse_records(header, records), offset
+
+
+def read_checkpoint(path):
+    """Checkpoint dict, or None when there is nothing to resume"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_checkpoint(path, checkpoint):
+    """Atomically replace the checkpoint file"""
+    with atomic_write(path) as f:
+        json.dump(checkpoint, f)
+
+
+def print_progress(rows, new_rows, elapsed):
+    """Report total rows and the rate achieved in this run"""
+    rate = new_rows / elapsed if elapsed > 0 else 0.0
+    print(f"Scored {rows:,} accounts ({rate:,.0f} rows/sec)", file=sys.stderr)
+
+
+def open_output(input_path, output_path, checkpoint_path=None, resume=False):
+    """Open the output for writing; on resume, trim it back to the last checkpoint
+
+    Returns (output file, input offset to start from, rows already written).
+    """
+    checkpoint = read_checkpoint(checkpoint_path) if (checkpoint_path and resume) else None
+    if checkpoint and checkpoint.get('input') != os.path.abspath(input_path):
+        raise ValueError(f"Checkpoint {checkpoint_path} belongs to a different input file")
+
+    if not checkpoint:
+        return open(output_path, 'w', newline=''), 0, 0
+
+    # Drop anything written after the last checkpoint, then carry on from there
+    with open(output_path, 'r+b') as f:
+        f.truncate(checkpoint['output_bytes'])
+    return open(output_path, 'a', newline=''), checkpoint['offset'], checkpoint['rows']
+
+
+def commit_chunk(output, input_path, offset, rows, checkpoint_path=None):
+    """Flush a written chunk and, if checkpointing, record how far we got"""
+    output.flush()
+    if checkpoint_path:
+        os.fsync(output.fileno())
+        write_checkpoint(checkpoint_path, {
+            'input': os.path.abspath(input_path),
+            'offset': offset,
+            'rows': rows,
+            'output_bytes': output.tell(),
+        })
+
+
+def score_stream(model, input_path, output_path, chunksize=DEFAULT_CHUNKSIZE,
+                 checkpoint_path=None, resume=False, progress=print_progress, calibration=None,
+                 reasons=0):
+    """Score input_path into output_path chunk by chunk, checkpointing after every chunk"""
+    output, offset, rows = open_output(input_path, output_path, checkpoint_path, resume)
+    start = time.perf_counter()
+    resumed_rows = rows
+
+    with output:
+        for chunk, offset in iter_record_chunks(input_path, chunksize, offset):
+            results = score_frame(model, chunk, calibration, reasons)
+            results.to_csv(output, header=(rows == 0), index=False)
+            rows += len(results)
+
+            commit_chunk(output, input_path, offset, rows, checkpoint_path)
+            if progress:
+                progress(rows, rows - resumed_rows, time.perf_counter() - start)
+
+    return rows
@@ -0,0 +1,21 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# The modules are flat scripts at the repository root, and read Data/ and models/ relative to it
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture(scope='session')
+def model():
+    from scoring import MODEL_PATH, load_model
+
+    return load_model(os.path.join(ROOT, MODEL_PATH))
@@ -0,0 +1,81 @@
+# tests/test_features.py
+import io
+import json
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import FEATURE_COLUMNS, extract_features, extract_features_frame, normalize_profile
+
+TEXTS = ['', ' ', None, float('nan'), 'anna', 'Anna Rose', ' anna.rose_1993 ', 'user²³', 'рус٣٤',
+         'ｆｕｌｌ５', 'a b  c', 'visit https://x.io', 'http://spam 💰💰', '12345', 'AnnaRose']
+FLAGS = [True, False, 1, 0, 'yes', 'No', 'private', 'Private ', 'true', '', ' ', None, float('nan'), 'n']
+COUNTS = [0, 7, 1500, 2.0, '12', ' 34 ', '1,234', '1,234,567', '', ' ', None, float('nan'), '0']
+
+
+def fuzzed_profiles(n, seed):
+    rng = random.Random(seed)
+    return [{
+        'username': rng.choice(TEXTS),
+        'fullname': rng.choice(TEXTS),
+        'bio': rng.choice(TEXTS),
+        'has_pic': rng.choice(FLAGS),
+        'is_private': rng.choice(FLAGS),
+        'posts': rng.choice(COUNTS),
+        'followers': rng.choice(COUNTS),
+        'following': rng.choice(COUNTS),
+    } for _ in range(n)]
+
+
+def per_row(records):
+    return pd.DataFrame([extract_features(*normalize_profile(record)) for record in records],
+                        columns=FEATURE_COLUMNS)
+
+
+def assert_same_features(frame, records):
+    expected = per_row(records)
+    actual = extract_features_frame(frame)[FEATURE_COLUMNS].reset_index(drop=True)
+    np.testing.assert_allclose(actual.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_frame_matches_per_row_on_fuzzed_profiles(seed):
+    records = fuzzed_profiles(400, seed)
+    assert_same_features(pd.DataFrame.from_records(records), records)
+
+
+def test_frame_matches_per_row_on_typed_columns():
+    # Numeric and boolean columns, as a CSV reader or JSON loader produces them
+    rng = np.random.RandomState(0)
+    frame = pd.DataFrame({
+        'username': ['anna_1993', 'bob', '', 'x²'] * 25,
+        'fullname': ['Anna', 'Bob B', '', 'X'] * 25,
+        'bio': ['', 'http://a', 'hi', ' '] * 25,
+        'has_pic': rng.rand(100) < 0.5,
+        'is_private': rng.randint(0, 2, 100),
+        'posts': rng.randint(0, 10 ** 6, 100),
+        'followers': np.where(rng.rand(100) < 0.1, np.nan, rng.randint(0, 10 ** 6, 100)),
+        'following': rng.randint(0, 10 ** 4, 100),
+    })
+    assert_same_features(frame, frame.to_dict('records'))
+
+
+def test_frame_with_missing_columns_matches_per_row():
+    records = [{'username': 'anna', 'posts': '3'}, {'username': 'bob1', 'posts': ''}]
+    assert_same_features(pd.DataFrame.from_records(records), records)
+
+
+def test_key_missing_from_some_records_takes_the_default():
+    # has_pic defaults to True and is_private to False when a record leaves them out
+    records = [
+        {'username': 'anna', 'has_pic': False, 'is_private': True},
+        {'username': 'bob'},
+        {'username': 'cara', 'has_pic': 0},
+        {'username': 'dan', 'is_private': 'yes'},
+    ]
+    assert_same_features(pd.DataFrame.from_records(records), records)
+    jsonl = io.StringIO(''.join(json.dumps(record) + '\n' for record in records))
+    assert_same_features(pd.read_json(jsonl, lines=True, dtype=False), records)
+    assert list(extract_features_frame(pd.DataFrame.from_records(records))['profile pic']) == [0, 1, 0, 1]
@@ -0,0 +1,94 @@
+# tests/test_profile_ingest.py
+import asyncio
+import json
+
+import pandas as pd
+
+from profile_ingest import ConnectionPool, fetch_profile, ingest, serve_stub_profiles
+
+# Longest a test waits before treating the ingest as hung
+TIMEOUT = 30
+
+
+def run_ingest(model, start_server, usernames, **options):
+    """Ingest usernames from the server start_server() returns; returns (stats, scored frame)"""
+    batches = []
+
+    async def run():
+        server = await start_server()
+        async with server:
+            host, port = server.sockets[0].getsockname()[:2]
+            return await asyncio.wait_for(
+                ingest(model, f"http://{host}:{port}", usernames, batches.append, **options), TIMEOUT)
+
+    stats = asyncio.run(run())
+    return stats, pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
+
+
+async def serve_records(records, close_after_response=False):
+    """Server returning records[username] for GET /profiles/<username>"""
+    async def handle(reader, writer):
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    break
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                username = request.split()[1].decode('latin-1').rsplit('/', 1)[-1]
+                body = json.dumps(records[username]).encode('utf-8')
+                writer.write(f"HTTP/1.1 200 OK\r\nContent-Length: {len(body)}\r\n\r\n"
+                             .encode('latin-1') + body)
+                await writer.drain()
+                if close_after_response:
+                    # Drops the keep-alive connection without a Connection: close header
+                    break
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+def test_ingest_scores_every_account(model):
+    usernames = [f"user{i}" for i in range(500)]
+    stats, results = run_ingest(model, serve_stub_profiles, usernames, concurrency=8, batch_size=64)
+    assert stats.scored == len(usernames)
+    assert stats.failed == 0
+    assert sorted(results['username']) == sorted(usernames)
+
+
+def test_ingest_retries_and_counts_failures(model):
+    usernames = [f"user{i}" for i in range(300)]
+    stats, results = run_ingest(model, lambda: serve_stub_profiles(failure_rate=0.3), usernames,
+                                concurrency=8, batch_size=32)
+    assert stats.scored + stats.failed == len(usernames)
+    # Three retries make a permanent failure rare at a 30% failure rate
+    assert stats.failed < len(usernames) * 0.05
+    assert len(results) == stats.scored
+
+
+def test_unscorable_profile_skips_only_itself(model):
+    from benchmark import synthetic_profiles
+
+    profiles = synthetic_profiles(2000).to_dict('records')
+    records = {f"user{i}": dict(profile, username=f"user{i}") for i, profile in enumerate(profiles)}
+    records['user7']['followers'] = '12.5k'
+    # With the default batch size the bad profile shares its batch with valid ones
+    stats, results = run_ingest(model, lambda: serve_records(records), list(records), concurrency=8)
+    assert stats.failed == 1
+    assert stats.scored == len(records) - 1
+    assert 'user7' not in set(results['username'])
+
+
+def test_stale_keep_alive_connection_is_retried():
+    async def run():
+        server = await serve_records({'anna': {'username': 'anna'}}, close_after_response=True)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            pool = ConnectionPool('127.0.0.1', port, size=1)
+            try:
+                return [await fetch_profile(pool, '/profiles/anna', backoff=0) for _ in range(3)]
+            finally:
+                await pool.close()
+
+    assert asyncio.run(run()) == [{'username': 'anna'}] * 3
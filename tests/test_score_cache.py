@@ -0,0 +1,51 @@
+# tests/test_score_cache.py
+import pandas as pd
+
+from benchmark import synthetic_profiles
+from features import FEATURE_COLUMNS, extract_features_frame
+from score_cache import ScoreCache
+
+
+def feature_rows(n):
+    return extract_features_frame(synthetic_profiles(n, seed=5))[FEATURE_COLUMNS]
+
+
+def test_put_is_skipped_after_a_model_swap():
+    cache = ScoreCache(model_version='v1')
+    features = feature_rows(1).iloc[0].to_dict()
+    version = cache.model_version
+    cache.set_model_version('v2')
+    cache.put(features, (1, 90.0, 0.9), version)
+    assert cache.get(features) is None
+
+    cache.put(features, (1, 90.0, 0.9), cache.model_version)
+    assert cache.get(features) == (1, 90.0, 0.9)
+
+
+def test_score_frame_does_not_cache_under_a_newer_version(model):
+    cache = ScoreCache(model_version='v1')
+    X = feature_rows(20)
+    version = cache.model_version
+    cache.set_model_version('v2')
+    scores = cache.score_frame(model, X, version)
+    assert len(scores) == len(X)
+    assert cache.stats()['size'] == 0
+
+    cache.score_frame(model, X, cache.model_version)
+    assert cache.stats()['size'] == len(X.drop_duplicates())
+    pd.testing.assert_frame_equal(cache.score_frame(model, X), scores, check_dtype=False)
+
+
+def test_score_frame_feeds_cached_rows_to_the_drift_monitor(model):
+    from drift_monitor import DriftMonitor, build_reference, set_monitor
+
+    X = feature_rows(50)
+    monitor = DriftMonitor(build_reference(X, model.predict(X)), window=10 ** 6, report=lambda result: None)
+    cache = ScoreCache(model_version='v1')
+    previous = set_monitor(monitor)
+    try:
+        cache.score_frame(model, X)
+        cache.score_frame(model, X)
+    finally:
+        set_monitor(previous)
+    assert monitor.rows == 2 * len(X)
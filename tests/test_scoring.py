@@ -0,0 +1,25 @@
+# tests/test_scoring.py
+import numpy as np
+
+from benchmark import check_record_parity, synthetic_profiles
+from compiled_forest import CompiledForest
+from features import FEATURE_COLUMNS
+
+
+def test_record_scorer_matches_dataframe_path(model):
+    profiles = synthetic_profiles(500, seed=7).to_dict('records')
+    assert check_record_parity(model, profiles) == []
+
+
+def test_record_scorer_matches_at_split_thresholds(model):
+    # Counts right at and around the forest's split points, where float32 rounding matters
+    compiled = CompiledForest.from_model(model)
+    rng = np.random.RandomState(3)
+    profiles = synthetic_profiles(200, seed=3).to_dict('records')
+    for field, column in (('posts', '#posts'), ('followers', '#followers'), ('following', '#follows')):
+        internal = compiled.children_left != np.arange(len(compiled.feature))
+        splits = compiled.threshold[internal & (compiled.feature == FEATURE_COLUMNS.index(column))]
+        candidates = np.unique(np.concatenate([np.floor(splits), np.ceil(splits)])).astype(np.int64)
+        for profile in profiles:
+            profile[field] = int(rng.choice(candidates))
+    assert check_record_parity(model, profiles) == []
@@ -0,0 +1,155 @@
+# training_pipeline.py
+import argparse
+import itertools
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold, cross_validate, train_test_split
+
+from dataset_store import read_table
+from file_utils import atomic_write
+from instrumentation import measure_latency
+from model_registry import hash_files
+
+CONFIG_PATH = 'training_config.json'
+
+
+def load_config(path=CONFIG_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_data(config):
+    """Load and combine the configured CSVs (or their converted datasets) into features and target"""
+    df = pd.concat([read_table(path) for path in config['data']], axis=0, ignore_index=True)
+    X = df.drop(config['target'], axis=1)
+    y = df[config['target']]
+    return X, y
+
+
+def candidate_params(param_grid):
+    """Every combination in the grid, in a stable order"""
+    names = sorted(param_grid)
+    for values in itertools.product(*(param_grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def evaluate_candidate(params, X_train, y_train, X_test, y_test, config):
+    """Cross-validate one parameter set, then fit it on the full training split"""
+    seed = config['seed']
+    cv = StratifiedKFold(n_splits=config['cv_folds'], shuffle=True, random_state=seed)
+    scores = cross_validate(
+        RandomForestClassifier(random_state=seed, **params),
+        X_train, y_train,
+        cv=cv,
+        scoring='accuracy',
+        n_jobs=config['n_jobs'],
+    )
+
+    model = RandomForestClassifier(random_state=seed, n_jobs=config['n_jobs'], **params)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    # Score like the GUI and service do: one process, one row at a time
+    model.set_params(n_jobs=None)
+    latency_ms, _ = measure_latency(model, X_test, config['latency_repeats'])
+    cv_accuracy = float(np.mean(scores['test_score']))
+
+    result = {
+        'params': params,
+        'cv_accuracy': cv_accuracy,
+        'cv_accuracy_std': float(np.std(scores['test_score'])),
+        'cv_fit_seconds': float(np.mean(scores['fit_time'])),
+        'fit_seconds': fit_seconds,
+        'test_accuracy': float(accuracy_score(y_test, model.predict(X_test))),
+        'latency_ms': latency_ms,
+        'accuracy_per_ms': cv_accuracy / latency_ms,
+    }
+    return result, model
+
+
+def select_candidate(results, selection, max_accuracy_drop):
+    """Pick by raw CV accuracy, or by accuracy-per-ms among near-best candidates"""
+    best_accuracy = max(result['cv_accuracy'] for result in results)
+    if selection == 'accuracy':
+        return max(results, key=lambda result: result['cv_accuracy'])
+    if selection != 'accuracy_per_ms':
+        raise ValueError(f"Unknown selection rule: {selection}")
+
+    eligible = [
+        result for result in results
+        if result['cv_accuracy'] >= best_accuracy - max_accuracy_drop
+    ]
+    return max(eligible, key=lambda result: result['accuracy_per_ms'])
+
+
+def run_pipeline(config):
+    """Search the grid, save the chosen model and write a report"""
+    np.random.seed(config['seed'])
+    X, y = load_data(config)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y,
+        test_size=config['test_size'],
+        random_state=config['seed'],
+        stratify=y,
+    )
+
+    results, models = [], []
+    with joblib.parallel_backend(config.get('backend', 'loky'), n_jobs=config['n_jobs']):
+        for params in candidate_params(config['param_grid']):
+            result, model = evaluate_candidate(params, X_train, y_train, X_test, y_test, config)
+            results.append(result)
+            models.append(model)
+            print("{params}: cv accuracy {cv_accuracy:.4f}, test accuracy {test_accuracy:.4f}, "
+                  "fit {fit_seconds:.2f}s, latency {latency_ms:.2f} ms".format(**result))
+
+    chosen = select_candidate(results, config['selection'], config.get('max_accuracy_drop', 0.0))
+    model = models[results.index(chosen)]
+
+    model_dir = os.path.dirname(config['model_output'])
+    if model_dir and not os.path.exists(model_dir):
+        os.makedirs(model_dir)
+    with atomic_write(config['model_output'], 'wb') as f:
+        joblib.dump(model, f)
+
+    report = {
+        'config': config,
+        'data_sha256': hash_files(config['data']),
+        'sklearn_version': sklearn.__version__,
+        'candidates': results,
+        'chosen': chosen,
+    }
+    with open(config['report_output'], 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nChosen by {config['selection']}: {chosen['params']}")
+    print(f"Model saved to {config['model_output']}, report to {config['report_output']}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-validated random forest search")
+    parser.add_argument('-c', '--config', default=CONFIG_PATH, help="JSON config file")
+    parser.add_argument('--seed', type=int, help="Override the configured seed")
+    parser.add_argument('--selection', choices=['accuracy', 'accuracy_per_ms'],
+                        help="Override the configured selection rule")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.seed is not None:
+        config['seed'] = args.seed
+    if args.selection:
+        config['selection'] = args.selection
+    run_pipeline(config)
+
+
+if __name__ == "__main__":
+    main()